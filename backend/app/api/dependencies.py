@@ -12,12 +12,12 @@ Dependencies - Dependency Injection Utilities
 """
 
 from typing import AsyncGenerator, Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import AsyncSessionLocal
-from app.core.security import decode_token
+from app.core.security import decode_token_cached
 from app.models.user import User, UserRole
 from app.services.auth_service import AuthService
 from app.core.database import get_db
@@ -37,6 +37,7 @@ security = HTTPBearer(
 # Current User Dependency
 # ========================================
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> User:
@@ -50,6 +51,9 @@ async def get_current_user(
     4. Query کاربر از دیتابیس
     5. بررسی فعال بودن
     
+    نتیجه در request.state.current_user نگه داشته می‌شود تا در یک request
+    فقط یک بار query کاربر اجرا شود (حتی اگر چند dependency به آن وابسته باشند).
+    
     استفاده:
     ```python
     @app.get("/profile")
@@ -60,6 +64,7 @@ async def get_current_user(
     ```
     
     Args:
+        request: درخواست جاری (برای cache کاربر در طول request)
         credentials: JWT token از header
         db: database session
         
@@ -69,12 +74,17 @@ async def get_current_user(
     Raises:
         HTTPException: اگر token نامعتبر یا کاربر یافت نشود
     """
+    # کاربر قبلاً در همین request بارگذاری شده است
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user is not None:
+        return cached_user
+    
     # استخراج token
     token = credentials.credentials
     
     # Decode token
     try:
-        payload = decode_token(token)
+        payload = decode_token_cached(token)
     except HTTPException:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -101,6 +111,7 @@ async def get_current_user(
     
     # دریافت کاربر از دیتابیس
     user = await AuthService.get_current_user(user_id, db)
+    request.state.current_user = user
     
     return user
 
@@ -113,6 +124,7 @@ async def get_current_user(
 security_optional = HTTPBearer(auto_error=False)
 
 async def get_current_user_optional(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security_optional),
     db: AsyncSession = Depends(get_db)
 ) -> Optional[User]:
@@ -121,7 +133,7 @@ async def get_current_user_optional(
         return None
 
     try:
-        return await get_current_user(credentials, db)
+        return await get_current_user(request, credentials, db)
     except HTTPException:
         return None
 
@@ -11,6 +11,7 @@ API endpoints برای احراز هویت:
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import get_db, get_current_user
@@ -90,7 +91,9 @@ async def register(
 # ========================================
 @router.post(
     "/login",
-    response_model=TokenResponse,
+    response_model=None,
+    response_class=ORJSONResponse,
+    responses={status.HTTP_200_OK: {"model": TokenResponse}},
     summary="ورود به سیستم",
     description="""
     ورود کاربر و دریافت JWT tokens.
@@ -112,22 +115,25 @@ async def register(
 async def login(
     login_data: UserLogin,
     db: AsyncSession = Depends(get_db)
-) -> TokenResponse:
+) -> ORJSONResponse:
     """
     ورود کاربر
     
+    پاسخ مستقیماً با orjson سریال می‌شود و از validation دوباره
+    TokenResponse (یک بار در سرویس و یک بار در response_model) جلوگیری می‌کند.
+    
     Args:
         login_data: ایمیل و رمز عبور
         db: database session
         
     Returns:
-        TokenResponse: tokens و اطلاعات کاربر
+        ORJSONResponse: tokens و اطلاعات کاربر (هم‌شکل TokenResponse)
         
     Raises:
         HTTPException 401: اگر ایمیل یا رمز اشتباه باشد
         HTTPException 403: اگر حساب غیرفعال باشد
     """
-    return await AuthService.login_user(login_data, db)
+    return ORJSONResponse(await AuthService.login_user(login_data, db))
 
 
 # ========================================
@@ -5,6 +5,9 @@ Reports Router
 API endpoints برای مدیریت گزارشات:
 - POST /: ایجاد گزارش متنی
 - POST /voice: ایجاد گزارش صوتی
+- POST /voice/stream: ایجاد گزارش صوتی با دریافت تدریجی متن (SSE)
+- POST /voice/upload-url: لینک آپلود مستقیم فایل صوتی به object storage
+- POST /voice/from-storage: ایجاد گزارش صوتی از فایل آپلود شده در object storage
 - GET /: لیست گزارشات
 - GET /{report_id}: دریافت یک گزارش
 - PUT /{report_id}: ویرایش گزارش
@@ -13,8 +16,10 @@ API endpoints برای مدیریت گزارشات:
 ================================================================================
 """
 
+import json
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies import (
@@ -28,11 +33,16 @@ from app.schemas.report import (
     ReportCreate,
     ReportUpdate,
     VoiceReportCreate,
+    VoiceReportFromStorage,
+    VoiceUploadUrlRequest,
+    VoiceUploadUrlResponse,
     ReportResponse,
+    ReportSummary,
     ReportListResponse,
     ReportStatistics
 )
 from app.services.report_service import ReportService
+from app.services.voice_service import voice_service
 
 
 # ========================================
@@ -165,6 +175,180 @@ async def create_voice_report(
     return ReportResponse.model_validate(report)
 
 
+# ========================================
+# Create Voice Report (Streaming)
+# ========================================
+def _sse_event(event: str, payload: str) -> str:
+    """قالب‌بندی یک رویداد Server-Sent Events"""
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+@router.post(
+    "/voice/stream",
+    response_class=StreamingResponse,
+    summary="ایجاد گزارش صوتی با دریافت تدریجی متن",
+    description="""
+    مانند `POST /voice`، اما متن هر بخش از صدا به محض تبدیل ارسال می‌شود
+    (text/event-stream) و client می‌تواند آن را پیش از پایان پردازش نمایش دهد.
+    
+    **فیلدها:** همان فیلدهای `POST /voice`
+    
+    **Header پیشنهادی:** `Accept: text/event-stream` (پاسخ فشرده نمی‌شود)
+    
+    **رویدادها:**
+    - `segment`: `{"start": 0.0, "end": 4.2, "text": "..."}`
+    - `report`: گزارش ایجاد شده (هم‌شکل ReportResponse) - رویداد پایانی
+    - `error`: `{"status_code": 500, "detail": "..."}` - در صورت خطا پس از شروع پاسخ
+    """
+)
+async def create_voice_report_stream(
+    audio_file: UploadFile = File(..., description="فایل صوتی"),
+    patient_name: str = Form(..., description="نام بیمار"),
+    patient_file_number: str = Form(..., description="شماره پرونده"),
+    patient_national_id: Optional[str] = Form(None, description="کد ملی"),
+    notes: Optional[str] = Form(None, description="یادداشت"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> StreamingResponse:
+    """
+    ایجاد گزارش صوتی با پاسخ تدریجی (SSE)
+    
+    Returns:
+        StreamingResponse: رویدادهای segment و در پایان report
+        
+    Raises:
+        HTTPException 400: اگر فرمت فایل مجاز نباشد (پیش از شروع پاسخ)
+    """
+    report_data = VoiceReportCreate(
+        patient_name=patient_name,
+        patient_file_number=patient_file_number,
+        patient_national_id=patient_national_id,
+        notes=notes
+    )
+    
+    # خطاهای ورودی پیش از شروع stream با status code مناسب برگردانده شوند
+    voice_service.validate_audio_file(audio_file)
+    
+    async def event_stream():
+        try:
+            async for event, data in ReportService.create_voice_report_stream(
+                audio_file,
+                report_data,
+                current_user,
+                db
+            ):
+                if event == "report":
+                    yield _sse_event(event, ReportResponse.model_validate(data).model_dump_json())
+                else:
+                    yield _sse_event(event, json.dumps(data, ensure_ascii=False))
+        except HTTPException as e:
+            yield _sse_event(
+                "error",
+                json.dumps({"status_code": e.status_code, "detail": e.detail}, ensure_ascii=False)
+            )
+        except Exception as e:
+            # مثلاً خطای دیتابیس هنگام ذخیره گزارش: stream بدون رویداد خطا قطع نشود
+            yield _sse_event(
+                "error",
+                json.dumps({
+                    "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    "detail": f"خطا در ایجاد گزارش: {str(e)}"
+                }, ensure_ascii=False)
+            )
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # غیرفعال کردن buffer در nginx
+        }
+    )
+
+
+# ========================================
+# Voice Upload URL (Object Storage)
+# ========================================
+@router.post(
+    "/voice/upload-url",
+    response_model=VoiceUploadUrlResponse,
+    summary="لینک آپلود مستقیم فایل صوتی",
+    description="""
+    دریافت لینک موقت برای آپلود مستقیم فایل صوتی به object storage.
+    
+    **مراحل:**
+    1. دریافت upload_url، upload_fields و object_key از این endpoint
+    2. ارسال فایل با `POST` (multipart/form-data) به upload_url: ابتدا تمام
+       upload_fields و در انتها فیلد `file`
+    3. ارسال object_key به `POST /voice/from-storage`
+    
+    **نکته:**
+    - فقط در صورت فعال بودن object storage (AUDIO_STORAGE_BACKEND=s3)
+    - فایل بزرگ‌تر از 10MB توسط خود object storage رد می‌شود
+    """
+)
+async def create_voice_upload_url(
+    upload_request: VoiceUploadUrlRequest,
+    current_user: User = Depends(get_current_user)
+) -> VoiceUploadUrlResponse:
+    """
+    ساخت لینک آپلود مستقیم
+    
+    Args:
+        upload_request: پسوند فایل
+        current_user: کاربر فعلی
+        
+    Returns:
+        VoiceUploadUrlResponse: لینک آپلود و object key
+    """
+    return await ReportService.create_voice_upload_url(upload_request, current_user)
+
+
+# ========================================
+# Create Voice Report (Object Storage)
+# ========================================
+@router.post(
+    "/voice/from-storage",
+    response_model=ReportResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="ایجاد گزارش صوتی از object storage",
+    description="""
+    ایجاد گزارش صوتی از فایلی که مستقیماً در object storage آپلود شده است.
+    
+    **نمونه درخواست:**
+    ```json
+    {
+        "object_key": "audio/usr-456/8f14e45f-....m4a",
+        "patient_name": "علی محمدی",
+        "patient_file_number": "P-12345"
+    }
+    ```
+    """
+)
+async def create_voice_report_from_storage(
+    report_data: VoiceReportFromStorage,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+) -> ReportResponse:
+    """
+    ایجاد گزارش صوتی از object storage
+    
+    Args:
+        report_data: اطلاعات گزارش و object key
+        current_user: کاربر فعلی
+        db: database session
+        
+    Returns:
+        ReportResponse: گزارش ایجاد شده با متن تبدیل شده
+    """
+    report = await ReportService.create_voice_report_from_storage(
+        report_data,
+        current_user,
+        db
+    )
+    return ReportResponse.model_validate(report)
+
+
 # ========================================
 # Get Reports List
 # ========================================
@@ -182,11 +366,13 @@ async def create_voice_report(
     **Pagination:**
     - page: شماره صفحه (پیش‌فرض: 1)
     - page_size: تعداد در صفحه (پیش‌فرض: 10، حداکثر: 100)
+    - cursor: مقدار next_cursor از پاسخ قبلی (keyset pagination؛ در این حالت page نادیده گرفته می‌شود)
     """
 )
 async def get_reports(
     status_filter: Optional[ReportStatus] = None,
     type_filter: Optional[ReportType] = None,
+    cursor: Optional[str] = None,
     pagination: PaginationParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -197,6 +383,7 @@ async def get_reports(
     Args:
         status_filter: فیلتر وضعیت
         type_filter: فیلتر نوع
+        cursor: cursor صفحه بعد (اختیاری)
         pagination: پارامترهای pagination
         current_user: کاربر فعلی
         db: database session
@@ -204,24 +391,26 @@ async def get_reports(
     Returns:
         ReportListResponse: لیست گزارشات با pagination
     """
-    reports, total = await ReportService.get_user_reports(
+    reports, total, next_cursor = await ReportService.get_user_reports(
         current_user,
         db,
         skip=pagination.skip,
         limit=pagination.limit,
         status_filter=status_filter,
-        type_filter=type_filter
+        type_filter=type_filter,
+        cursor=cursor
     )
     
     # محاسبه تعداد صفحات
     total_pages = (total + pagination.page_size - 1) // pagination.page_size
     
     return ReportListResponse(
-        items=[ReportResponse.model_validate(r) for r in reports],
+        items=[ReportSummary.model_validate(r) for r in reports],
         total=total,
         page=pagination.page,
         page_size=pagination.page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
@@ -263,7 +452,7 @@ async def get_report(
         )
     
     # بررسی دسترسی
-    if report.nurse_id != current_user.id and not current_user.is_admin:
+    if report.nurse_id != current_user.id and not current_user.is_admin():
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="شما دسترسی به این گزارش را ندارید"
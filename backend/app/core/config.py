@@ -44,7 +44,20 @@ class Settings(BaseSettings):
     )
     DATABASE_POOL_SIZE: int = Field(default=20, ge=5, le=100)
     DATABASE_MAX_OVERFLOW: int = Field(default=10, ge=0, le=50)
+    DATABASE_POOL_TIMEOUT: int = Field(default=30, ge=1, le=300)
+    DATABASE_POOL_RECYCLE: int = Field(default=1800, ge=60, le=86400)
+    DATABASE_POOL_PRE_PING: bool = Field(default=True)
+    DATABASE_USE_PGBOUNCER: bool = Field(
+        default=False,
+        description="اتصال از طریق PgBouncer (pool_mode=transaction)؛ cache prepared statement غیرفعال می‌شود"
+    )
     DATABASE_ECHO: bool = Field(default=False)
+    DATABASE_STATEMENT_CACHE_SIZE: int = Field(
+        default=1024,
+        ge=0,
+        le=10000,
+        description="اندازه cache prepared statement های asyncpg (0 = غیرفعال)"
+    )
     
     # ========================================
     # Security
@@ -56,6 +69,12 @@ class Settings(BaseSettings):
     ALGORITHM: str = Field(default="HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, ge=5, le=1440)
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(default=7, ge=1, le=30)
+    PASSWORD_HASH_WORKERS: int = Field(
+        default=0,
+        ge=0,
+        le=64,
+        description="تعداد process های hash پسورد (0 = تعداد CPU)"
+    )
     
     # ========================================
     # CORS
@@ -74,9 +93,84 @@ class Settings(BaseSettings):
         default="base",
         description="سایز مدل Whisper: tiny, base, small, medium, large"
     )
+    WHISPER_BACKEND: str = Field(
+        default="openai-whisper",
+        description="موتور اجرا: openai-whisper (PyTorch)، faster-whisper (CTranslate2، INT8) ، openvino (INT8 روی CPU اینتل) یا onnx (ONNX Runtime، IOBinding روی GPU)؛ موتورهای غیر پیش‌فرض از requirements-optional/ نصب می‌شوند"
+    )
+    WHISPER_COMPUTE_TYPE: str = Field(
+        default="int8",
+        description="نوع محاسبات faster-whisper: int8, int8_float16, float16, float32"
+    )
     WHISPER_DEVICE: str = Field(
         default="cpu",
-        description="دستگاه: cpu یا cuda (GPU)"
+        description="دستگاه: cpu، cuda (GPU) یا auto (GPU در صورت وجود)"
+    )
+    WHISPER_THREADS: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=256,
+        description="تعداد thread های PyTorch روی CPU؛ خالی = تعداد هسته‌ها"
+    )
+    WHISPER_CPU_BF16: bool = Field(
+        default=False,
+        description="اجرای مدل با bfloat16 روی CPU (مناسب پردازنده‌های دارای AMX/AVX-512 BF16)"
+    )
+    WHISPER_QUANTIZE_DECODER: bool = Field(
+        default=False,
+        description="کوانتیزه کردن INT8 لایه‌های Linear دیکودر روی CPU (encoder در FP32 می‌ماند؛ غیرفعال کننده WHISPER_CPU_BF16)"
+    )
+    WHISPER_CACHE_DIR: Optional[str] = Field(
+        default=None,
+        description="مسیر نگهداری وزن‌های مدل (مثلاً /dev/shm/whisper-cache روی tmpfs)؛ خالی = ~/.cache"
+    )
+    WHISPER_VAD: bool = Field(
+        default=True,
+        description="حذف سکوت‌ها با Silero VAD پیش از transcription (در صورت نصب silero-vad)"
+    )
+    WHISPER_PRELOAD: bool = Field(
+        default=True,
+        description="بارگذاری مدل Whisper در پس‌زمینه هنگام startup (در غیر این صورت در اولین درخواست)"
+    )
+    WHISPER_CONCURRENCY: int = Field(
+        default=1,
+        ge=1,
+        le=16,
+        description=(
+            "حداکثر تعداد transcription همزمان (فقط faster-whisper با num_workers؛ "
+            "سایر موتورها یک نمونه مدل مشترک دارند و همیشه یکی یکی اجرا می‌شوند)"
+        )
+    )
+    WHISPER_BATCH_SIZE: int = Field(
+        default=1,
+        ge=1,
+        le=32,
+        description=(
+            "حداکثر تعداد کلیپ کوتاه (≤30 ثانیه) در یک batch مدل (1 = بدون batch). "
+            "در حالت batch، fallback دمایی و حذف بخش‌های بی‌صدای model.transcribe اجرا نمی‌شود"
+        )
+    )
+    WHISPER_BATCH_WAIT_MS: int = Field(
+        default=50,
+        ge=0,
+        le=1000,
+        description="حداکثر زمان انتظار برای پر شدن batch (میلی‌ثانیه)"
+    )
+    WHISPER_MAX_RETRIES: int = Field(
+        default=2,
+        ge=0,
+        le=5,
+        description="تعداد تلاش مجدد transcription در خطاهای موقت (فقط کمبود حافظه GPU)"
+    )
+    
+    TRANSCRIPTION_CACHE_TTL: int = Field(
+        default=86400,
+        ge=0,
+        le=2592000,
+        description="مدت نگهداری نتیجه transcription هر فایل (ثانیه، بر اساس hash محتوا)؛ 0 = غیرفعال"
+    )
+    TRANSCRIPTION_CACHE_BACKEND: str = Field(
+        default="memory",
+        description="محل cache نتایج transcription: memory (همان process) یا redis (مشترک بین workerها)"
     )
     
     # ========================================
@@ -94,6 +188,42 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE: int = Field(default=10485760, ge=1048576, le=104857600)
     ALLOWED_AUDIO_FORMATS: str = Field(default="wav,mp3,m4a,ogg,webm,flac")
     UPLOAD_DIR: str = Field(default="uploads/audio")
+    STORE_AUDIO_FILES: bool = Field(
+        default=True,
+        description="نگهداری فایل صوتی گزارش‌ها؛ در حالت False فقط متن تبدیل شده ذخیره می‌شود"
+    )
+    
+    # ========================================
+    # Object Storage (S3-compatible، اختیاری)
+    # ========================================
+    AUDIO_STORAGE_BACKEND: str = Field(
+        default="local",
+        description="محل نگهداری فایل‌های صوتی: local یا s3"
+    )
+    S3_BUCKET: Optional[str] = Field(default=None)
+    S3_ENDPOINT_URL: Optional[str] = Field(
+        default=None,
+        description="آدرس سرویس S3-compatible (خالی برای AWS)"
+    )
+    S3_REGION: Optional[str] = Field(default=None)
+    S3_ACCESS_KEY_ID: Optional[str] = Field(default=None)
+    S3_SECRET_ACCESS_KEY: Optional[str] = Field(default=None)
+    S3_PRESIGNED_EXPIRE_SECONDS: int = Field(
+        default=900,
+        ge=60,
+        le=3600,
+        description="مدت اعتبار لینک آپلود مستقیم (ثانیه)"
+    )
+    
+    # ========================================
+    # Cache
+    # ========================================
+    STATISTICS_CACHE_TTL: int = Field(
+        default=60,
+        ge=0,
+        le=3600,
+        description="مدت نگهداری آمار گزارشات در cache (ثانیه)"
+    )
     
     # ========================================
     # Rate Limiting
@@ -160,6 +290,38 @@ class Settings(BaseSettings):
             raise ValueError(f"LOG_LEVEL باید یکی از {allowed} باشد")
         return v.upper()
     
+    @field_validator("AUDIO_STORAGE_BACKEND")
+    @classmethod
+    def validate_audio_storage_backend(cls, v):
+        allowed = ["local", "s3"]
+        if v not in allowed:
+            raise ValueError(f"AUDIO_STORAGE_BACKEND باید یکی از {allowed} باشد")
+        return v
+    
+    @field_validator("WHISPER_BACKEND")
+    @classmethod
+    def validate_whisper_backend(cls, v):
+        allowed = ["openai-whisper", "faster-whisper", "openvino", "onnx"]
+        if v not in allowed:
+            raise ValueError(f"WHISPER_BACKEND باید یکی از {allowed} باشد")
+        return v
+    
+    @field_validator("TRANSCRIPTION_CACHE_BACKEND")
+    @classmethod
+    def validate_transcription_cache_backend(cls, v):
+        allowed = ["memory", "redis"]
+        if v not in allowed:
+            raise ValueError(f"TRANSCRIPTION_CACHE_BACKEND باید یکی از {allowed} باشد")
+        return v
+    
+    @field_validator("WHISPER_DEVICE")
+    @classmethod
+    def validate_whisper_device(cls, v):
+        allowed = ["cpu", "cuda", "auto"]
+        if v not in allowed:
+            raise ValueError(f"WHISPER_DEVICE باید یکی از {allowed} باشد")
+        return v
+    
     @field_validator("WHISPER_MODEL_SIZE")
     @classmethod
     def validate_whisper_model(cls, v):
@@ -9,6 +9,7 @@
 # # ================================================================================
 
 # from typing import AsyncGenerator, Optional
+from uuid import uuid4
 
 # from sqlalchemy.ext.asyncio import (
 #     AsyncSession,
@@ -195,6 +196,7 @@
 # ========================================
 
 from typing import AsyncGenerator, Optional
+from uuid import uuid4
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     create_async_engine,
@@ -215,6 +217,27 @@ def get_database_url() -> str:
         url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
     return url
 
+def get_connect_args() -> dict:
+    """
+    پارامترهای اتصال asyncpg.
+    cache prepared statement ها باعث می‌شود query های پرتکرار (مثل lookup کاربر
+    با email یا id در احراز هویت) در هر بار اجرا دوباره parse و plan نشوند.
+    پشت PgBouncer در حالت transaction، prepared statement ها بین اتصالات
+    سرور جابه‌جا می‌شوند؛ بنابراین cache باید غیرفعال باشد و نام prepared statement ها
+    یکتا باشد (نام‌های ترتیبی asyncpg روی اتصال مشترک سرور تداخل می‌کنند).
+    """
+    if settings.DATABASE_USE_PGBOUNCER:
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    cache_size = settings.DATABASE_STATEMENT_CACHE_SIZE
+    return {
+        "statement_cache_size": cache_size,           # cache سمت asyncpg
+        "prepared_statement_cache_size": cache_size,  # cache سمت SQLAlchemy
+    }
+
 def create_engine() -> AsyncEngine:
     """
     ایجاد engine سازگار با SQLAlchemy async.
@@ -231,7 +254,11 @@ def create_engine() -> AsyncEngine:
             poolclass=QueuePool,
             pool_size=settings.DATABASE_POOL_SIZE,
             max_overflow=settings.DATABASE_MAX_OVERFLOW,
-            pool_recycle=3600,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+            # بررسی سلامت اتصال قبل از استفاده (اتصالات قطع‌شده دوباره ساخته می‌شوند)
+            pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+            connect_args=get_connect_args(),
         )
     else:
         # در development از NullPool (بدون پارامترهایی که با NullPool ناسازگارند) استفاده می‌کنیم
@@ -240,6 +267,7 @@ def create_engine() -> AsyncEngine:
             echo=settings.DATABASE_ECHO,
             future=True,
             poolclass=NullPool,
+            connect_args=get_connect_args(),
         )
 
     return engine
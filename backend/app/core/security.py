@@ -12,8 +12,14 @@
 ================================================================================
 """
 
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from cachetools import LRUCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
@@ -25,17 +31,34 @@ from app.core.config import settings
 # ========================================
 # تنظیمات Password Hashing
 # ========================================
+# یک CryptContext واحد در سطح ماژول ساخته می‌شود و در تمام فراخوانی‌ها
+# reuse می‌شود (parse تنظیمات و cost فقط یک بار در زمان import)
 pwd_context = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
     bcrypt__rounds=12  # تعداد rounds برای افزایش امنیت
 )
 
+# ========================================
+# Process Pool برای Password Hashing
+# ========================================
+# bcrypt یک عملیات CPU-bound و کند است؛ اجرای آن در process های جدا
+# از event loop و thread pool پیش‌فرض (که برای I/O استفاده می‌شود)
+# جلوگیری می‌کند. pool در lifespan اپلیکیشن ساخته و بسته می‌شود.
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_semaphore: Optional[asyncio.Semaphore] = None
 # ========================================
 # تنظیمات Bearer Token
 # ========================================
 security = HTTPBearer()
 
+# ========================================
+# Cache توکن‌های decode شده
+# ========================================
+# کلید: رشته token (opaque)، مقدار: payload تایید شده
+# فقط token های معتبر cache می‌شوند و exp در هر hit دوباره بررسی می‌شود
+_decoded_token_cache: LRUCache = LRUCache(maxsize=4096)
+
 
 # ========================================
 # توابع Password Hashing
@@ -76,6 +99,134 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_password_and_update(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    بررسی پسورد و در صورت نیاز تولید hash جدید
+    
+    بررسی needs_rehash (مثلاً تغییر تعداد rounds) فقط بعد از verify موفق
+    انجام می‌شود تا در مسیر ورود ناموفق هزینه hash دوباره پرداخت نشود.
+    
+    Args:
+        plain_password: پسورد وارد شده توسط کاربر
+        hashed_password: پسورد Hash شده در دیتابیس
+        
+    Returns:
+        Tuple[bool, Optional[str]]: صحت پسورد و hash جدید (یا None)
+        
+    Example:
+        >>> is_valid, new_hash = verify_password_and_update("MyPass", hashed_password)
+        >>> if is_valid and new_hash:
+        >>>     user.hashed_password = new_hash
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+# ========================================
+# نسخه‌های async (اجرا در Process Pool)
+# ========================================
+
+def init_hash_pool() -> None:
+    """
+    ساخت process pool برای hash پسورد (در startup اپلیکیشن)
+    
+    تعداد worker ها از PASSWORD_HASH_WORKERS خوانده می‌شود (0 = تعداد CPU).
+    تعداد hash های هم‌زمان با یک semaphore به همین عدد محدود می‌شود تا
+    درخواست‌های زیاد ورود باعث صف نامحدود در pool نشوند.
+    """
+    global _hash_pool, _hash_semaphore
+    
+    if _hash_pool is not None:
+        return
+    
+    workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+    
+    # worker ها به صورت lazy (در اولین login) ساخته می‌شوند؛ در آن زمان process
+    # اصلی thread های torch/whisper و anyio را دارد و fork آن ممکن است child را
+    # در deadlock قرار دهد. forkserver (یا spawn) process تمیز می‌سازد.
+    start_method = (
+        "forkserver"
+        if "forkserver" in multiprocessing.get_all_start_methods()
+        else "spawn"
+    )
+    _hash_pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(start_method)
+    )
+    _hash_semaphore = asyncio.Semaphore(workers)
+
+
+async def shutdown_hash_pool() -> None:
+    """
+    بستن process pool (در shutdown اپلیکیشن)
+    
+    انتظار برای خروج worker ها در یک thread انجام می‌شود تا event loop مسدود نشود.
+    """
+    global _hash_pool, _hash_semaphore
+    
+    pool = _hash_pool
+    _hash_pool = None
+    _hash_semaphore = None
+    
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+
+async def _run_in_hash_pool(func, *args):
+    """
+    اجرای تابع hash در process pool
+    
+    اگر pool ساخته نشده باشد (مثلاً در اسکریپت‌ها)، تابع در thread pool
+    پیش‌فرض اجرا می‌شود تا event loop مسدود نشود.
+    """
+    loop = asyncio.get_running_loop()
+    
+    if _hash_pool is None or _hash_semaphore is None:
+        return await loop.run_in_executor(None, func, *args)
+    
+    async with _hash_semaphore:
+        return await loop.run_in_executor(_hash_pool, func, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    نسخه async از hash_password (بدون مسدود کردن event loop)
+    
+    Example:
+        >>> hashed = await hash_password_async("MySecurePass123")
+    """
+    return await _run_in_hash_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    نسخه async از verify_password (بدون مسدود کردن event loop)
+    
+    Example:
+        >>> is_valid = await verify_password_async("MyPass", hashed_password)
+    """
+    return await _run_in_hash_pool(verify_password, plain_password, hashed_password)
+
+
+async def verify_password_and_update_async(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    نسخه async از verify_password_and_update (بدون مسدود کردن event loop)
+    
+    Example:
+        >>> is_valid, new_hash = await verify_password_and_update_async("MyPass", hashed_password)
+    """
+    return await _run_in_hash_pool(
+        verify_password_and_update,
+        plain_password,
+        hashed_password
+    )
+
+
 # ========================================
 # توابع JWT Token
 # ========================================
@@ -203,6 +354,47 @@ def decode_token(token: str) -> Dict[str, Any]:
         )
 
 
+def decode_token_cached(token: str) -> Dict[str, Any]:
+    """
+    رمزگشایی JWT Token با cache
+    
+    بررسی امضای HMAC برای هر token فقط یک بار انجام می‌شود؛ در درخواست‌های
+    بعدی با همان token، payload از cache خوانده می‌شود تا زمان انقضا.
+    
+    Args:
+        token: JWT Token برای رمزگشایی
+        
+    Returns:
+        Dict: محتویات token (payload)
+        
+    Raises:
+        HTTPException: در صورت نامعتبر یا منقضی بودن token
+        
+    Example:
+        >>> payload = decode_token_cached(token)
+        >>> user_id = payload.get("sub")
+    """
+    payload = _decoded_token_cache.get(token)
+    
+    if payload is None:
+        # decode_token در صورت نامعتبر بودن خطا می‌دهد و چیزی cache نمی‌شود
+        payload = decode_token(token)
+        _decoded_token_cache[token] = payload
+        return payload
+    
+    # token منقضی شده از cache حذف می‌شود
+    exp = payload.get("exp")
+    if exp is not None and exp < time.time():
+        _decoded_token_cache.pop(token, None)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="توکن نامعتبر یا منقضی شده است",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return payload
+
+
 async def get_current_user_id(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> str:
@@ -229,7 +421,7 @@ async def get_current_user_id(
     token = credentials.credentials
     
     # رمزگشایی token
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     
     # استخراج user_id
     user_id: Optional[str] = payload.get("sub")
@@ -325,9 +517,16 @@ def check_password_strength(password: str) -> bool:
 __all__ = [
     "hash_password",
     "verify_password",
+    "verify_password_and_update",
+    "hash_password_async",
+    "verify_password_async",
+    "verify_password_and_update_async",
+    "init_hash_pool",
+    "shutdown_hash_pool",
     "create_access_token",
     "create_refresh_token",
     "decode_token",
+    "decode_token_cached",
     "get_current_user_id",
     "create_tokens_pair",
     "check_password_strength",
@@ -13,9 +13,10 @@ Main FastAPI Application
 ================================================================================
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
@@ -26,6 +27,8 @@ import logging
 
 from app.core.config import settings
 from app.core.database import init_db, check_db_connection, engine
+from app.core.security import init_hash_pool, shutdown_hash_pool
+from app.services.voice_service import voice_service
 
 
 # ========================================
@@ -78,6 +81,15 @@ async def lifespan(app: FastAPI):
         except Exception as e:
             logger.error(f"❌ خطا در ایجاد جداول: {e}")
     
+    # process pool برای hash پسورد
+    init_hash_pool()
+    logger.info("✅ Process pool هش پسورد آماده است")
+    
+    # بارگذاری مدل Whisper در پس‌زمینه (startup منتظر آن نمی‌ماند)
+    if settings.WHISPER_PRELOAD:
+        app.state.whisper_warmup = asyncio.create_task(voice_service.warmup())
+        logger.info("🔄 بارگذاری مدل Whisper در پس‌زمینه آغاز شد")
+    
     # لاگ تنظیمات
     logger.info(f"📝 نام اپلیکیشن: {settings.APP_NAME}")
     logger.info(f"📝 نسخه: {settings.APP_VERSION}")
@@ -98,6 +110,14 @@ async def lifespan(app: FastAPI):
     await engine.dispose()
     logger.info("✅ اتصالات دیتابیس بسته شدند")
     
+    # بستن process pool هش پسورد
+    await shutdown_hash_pool()
+    logger.info("✅ Process pool هش پسورد بسته شد")
+    
+    # بستن thread pool مدل Whisper
+    voice_service.shutdown()
+    logger.info("✅ Thread pool مدل Whisper بسته شد")
+    
     logger.info("👋 خداحافظ!")
 
 
@@ -111,6 +131,9 @@ app = FastAPI(
     docs_url="/docs" if settings.is_development else None,
     redoc_url="/redoc" if settings.is_development else None,
     openapi_url="/openapi.json" if settings.is_development else None,
+    # سریال‌سازی تمام پاسخ‌ها با orjson (سریع‌تر از json استاندارد،
+    # و پشتیبانی مستقیم از datetime)
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -131,7 +154,23 @@ logger.info("✅ CORS Middleware فعال شد")
 # ========================================
 # Middleware - GZip Compression
 # ========================================
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+class SSEAwareGZipMiddleware(GZipMiddleware):
+    """
+    GZip برای همه پاسخ‌ها به جز درخواست‌های SSE (Accept: text/event-stream)
+    
+    فشرده‌سازی، رویدادهای کوچک را تا پر شدن buffer نگه می‌دارد و ارسال تدریجی را از بین می‌برد.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            accept = dict(scope["headers"]).get(b"accept", b"")
+            if b"text/event-stream" in accept:
+                await self.app(scope, receive, send)
+                return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(SSEAwareGZipMiddleware, minimum_size=1000)
 logger.info("✅ GZip Middleware فعال شد")
 
 
@@ -175,7 +214,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "type": error["type"]
         })
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "detail": "خطا در اعتبارسنجی داده‌ها",
@@ -191,7 +230,7 @@ async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
     """
     logger.error(f"Database error: {str(exc)}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "خطا در پردازش درخواست دیتابیس"
@@ -206,7 +245,7 @@ async def general_exception_handler(request: Request, exc: Exception):
     """
     logger.error(f"Unexpected error: {str(exc)}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "detail": "خطای غیرمنتظره در سرور"
@@ -9,7 +9,7 @@ from typing import Optional
 from enum import Enum
 from sqlalchemy import (
     String, Text, Integer, Float, Boolean,
-    DateTime, Enum as SQLEnum, ForeignKey
+    DateTime, Enum as SQLEnum, ForeignKey, Index
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
@@ -40,6 +40,10 @@ class ReportType(str, Enum):
 class Report(Base):
     __tablename__ = "reports"
 
+    # مقادیر server_default (created_at, updated_at) در همان INSERT با RETURNING
+    # خوانده می‌شوند؛ نیازی به refresh پس از commit نیست
+    __mapper_args__ = {"eager_defaults": True}
+
     # شناسه یکتا (UUID، رشته 36 حرفی)
     id: Mapped[str] = mapped_column(
         String(36),
@@ -202,6 +206,11 @@ class Report(Base):
             f"status={self.status})>"
         )
 
+    @property
+    def nurse_name(self) -> Optional[str]:
+        """نام کامل پرستار ثبت‌کننده (برای ReportResponse.nurse_name)"""
+        return self.nurse.full_name if self.nurse else None
+
     def is_editable(self) -> bool:
         return self.status in [ReportStatus.DRAFT, ReportStatus.FINAL]
 
@@ -236,7 +245,7 @@ class Report(Base):
         return {
             "id": self.id,
             "nurse_id": self.nurse_id,
-            "nurse_name": self.nurse.full_name if self.nurse else None,
+            "nurse_name": self.nurse_name,
             "patient_name": self.patient_name,
             "patient_national_id": self.patient_national_id,
             "patient_file_number": self.patient_file_number,
@@ -258,4 +267,29 @@ class Report(Base):
         }
 
 
+# ========================================
+# Indexes
+# ========================================
+# index ترکیبی برای لیست گزارشات هر پرستار با keyset pagination
+# (WHERE nurse_id = ? ORDER BY created_at DESC, id DESC)
+# (پیشوند (nurse_id, created_at DESC) برای مرتب‌سازی بر اساس زمان نیز کافی است)
+Index(
+    "ix_reports_nurse_created_id",
+    Report.nurse_id,
+    Report.created_at.desc(),
+    Report.id.desc(),
+)
+
+# فیلترهای وضعیت و نوع در لیست گزارشات و آمار
+Index("ix_reports_nurse_status", Report.nurse_id, Report.status)
+Index("ix_reports_nurse_type", Report.nurse_id, Report.report_type)
+
+# partial index برای شمارش گزارشات بررسی‌شده هر پرستار
+Index(
+    "ix_reports_nurse_reviewed",
+    Report.nurse_id,
+    postgresql_where=Report.reviewed_by_id.isnot(None),
+)
+
+
 __all__ = ["Report", "ReportStatus", "ReportType"]
@@ -16,7 +16,7 @@
 from datetime import datetime
 from typing import Optional, List
 from enum import Enum
-from sqlalchemy import String, Boolean, DateTime, Enum as SQLEnum, Text
+from sqlalchemy import String, Boolean, DateTime, Enum as SQLEnum, Text, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 import uuid
@@ -70,6 +70,15 @@ class User(Base):
     
     __tablename__ = "users"
     
+    # ========================================
+    # Indexes
+    # ========================================
+    # index ترکیبی (id, is_active) برای lookup پرتکرار get_current_user
+    # تا بررسی فعال بودن کاربر با index-only scan انجام شود
+    __table_args__ = (
+        Index("ix_users_id_active", "id", "is_active"),
+    )
+    
     # ========================================
     # Primary Key
     # ========================================
@@ -7,7 +7,7 @@ Schemas برای Report (Pydantic Models)
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from pydantic import BaseModel, Field, validator
 from app.models.report import ReportStatus, ReportType
 
@@ -90,6 +90,42 @@ class VoiceReportCreate(BaseModel):
     notes: Optional[str] = Field(None, description="یادداشت")
 
 
+class VoiceUploadUrlRequest(BaseModel):
+    """
+    Schema برای درخواست لینک آپلود مستقیم فایل صوتی
+    
+    استفاده: POST /api/v1/reports/voice/upload-url
+    """
+    file_extension: str = Field(..., description="پسوند فایل (wav, mp3, m4a, ...)")
+
+
+class VoiceUploadUrlResponse(BaseModel):
+    """
+    Schema پاسخ لینک آپلود مستقیم
+    
+    client فایل را با POST (multipart/form-data: ابتدا upload_fields، در انتها
+    فیلد file) به upload_url ارسال می‌کند و سپس object_key را به
+    /voice/from-storage می‌فرستد.
+    """
+    upload_url: str = Field(..., description="لینک موقت آپلود (POST)")
+    upload_fields: Dict[str, str] = Field(
+        ...,
+        description="فیلدهای فرم امضا شده (policy با محدودیت سایز) که باید همراه فایل ارسال شوند"
+    )
+    object_key: str = Field(..., description="کلید فایل در object storage")
+    content_type: str = Field(..., description="Content-Type الزامی برای آپلود")
+    expires_in: int = Field(..., description="مدت اعتبار لینک (ثانیه)")
+
+
+class VoiceReportFromStorage(VoiceReportCreate):
+    """
+    Schema برای ایجاد گزارش صوتی از فایل آپلود شده در object storage
+    
+    استفاده: POST /api/v1/reports/voice/from-storage
+    """
+    object_key: str = Field(..., description="کلید فایل دریافت شده از upload-url")
+
+
 # ========================================
 # Update Schema
 # ========================================
@@ -167,6 +203,38 @@ class ReportResponse(ReportBase):
         }
 
 
+# ========================================
+# Summary Schema (برای لیست)
+# ========================================
+
+class ReportSummary(BaseModel):
+    """
+    Schema خلاصه گزارش برای لیست
+    
+    فقط ستون‌های لازم برای نمایش لیست؛ محتوای کامل گزارش از
+    GET /api/v1/reports/{report_id} دریافت می‌شود.
+    """
+    id: str = Field(..., description="شناسه گزارش")
+    patient_name: str = Field(..., description="نام بیمار")
+    status: ReportStatus = Field(..., description="وضعیت گزارش")
+    report_type: ReportType = Field(..., description="نوع گزارش")
+    is_transcribed: bool = Field(..., description="آیا تبدیل شده؟")
+    created_at: datetime = Field(..., description="زمان ایجاد")
+    
+    class Config:
+        from_attributes = True
+        json_schema_extra = {
+            "example": {
+                "id": "rep-123",
+                "patient_name": "علی محمدی",
+                "status": "final",
+                "report_type": "voice",
+                "is_transcribed": True,
+                "created_at": "2024-11-19T10:00:00Z"
+            }
+        }
+
+
 # ========================================
 # List Response
 # ========================================
@@ -175,11 +243,15 @@ class ReportListResponse(BaseModel):
     """
     Schema برای لیست گزارشات (با pagination)
     """
-    items: list[ReportResponse] = Field(..., description="لیست گزارشات")
+    items: list[ReportSummary] = Field(..., description="لیست گزارشات")
     total: int = Field(..., description="تعداد کل")
     page: int = Field(..., description="صفحه فعلی")
     page_size: int = Field(..., description="تعداد در صفحه")
     total_pages: int = Field(..., description="تعداد کل صفحات")
+    next_cursor: Optional[str] = Field(
+        None,
+        description="cursor صفحه بعد (برای keyset pagination)"
+    )
     
     class Config:
         json_schema_extra = {
@@ -188,7 +260,8 @@ class ReportListResponse(BaseModel):
                 "total": 100,
                 "page": 1,
                 "page_size": 10,
-                "total_pages": 10
+                "total_pages": 10,
+                "next_cursor": None
             }
         }
 
@@ -234,6 +307,7 @@ __all__ = [
     "VoiceReportCreate",
     "ReportUpdate",
     "ReportResponse",
+    "ReportSummary",
     "ReportListResponse",
     "ReportStatistics",
 ]
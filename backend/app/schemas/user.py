@@ -12,12 +12,71 @@ Schemas برای User (Pydantic Models)
 ================================================================================
 """
 
+import re
+import unicodedata
 from datetime import datetime
 from typing import Optional
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, validator
 from app.models.user import UserRole
 
 
+# ========================================
+# اعتبارسنجی سبک ایمیل
+# ========================================
+# یک قاعده مشترک برای ثبت‌نام، ورود و ویرایش (UserCreate، UserLogin، UserUpdate):
+# regex از پیش کامپایل شده به جای email-validator در هر request. آدرس‌های unicode/IDN
+# و دامنه‌های punycode پذیرفته می‌شوند تا ایمیلی که در ثبت‌نام قبول شده در ورود رد نشود.
+# UserBase/UserResponse ایمیل ذخیره شده را دوباره اعتبارسنجی نمی‌کنند.
+_EMAIL_RE = re.compile(r"^[^@\s]{1,64}@(?:[^@\s.]+\.)+[^@\s.]{2,}$")
+
+
+# ========================================
+# نمونه‌های OpenAPI (یک بار در سطح ماژول ساخته می‌شوند)
+# ========================================
+_USER_RESPONSE_EXAMPLE = {
+    "id": "123e4567-e89b-12d3-a456-426614174000",
+    "employee_code": "NUR001",
+    "email": "nurse@hospital.com",
+    "first_name": "فاطمه",
+    "last_name": "احمدی",
+    "phone_number": "09123456789",
+    "department": "ICU",
+    "role": "nurse",
+    "is_active": True,
+    "bio": "پرستار بخش مراقبت‌های ویژه",
+    "last_login": "2024-11-19T10:30:00Z",
+    "created_at": "2024-01-15T08:00:00Z",
+    "updated_at": "2024-11-19T10:30:00Z"
+}
+
+_TOKEN_RESPONSE_EXAMPLE = {
+    "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+    "refresh_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
+    "token_type": "bearer",
+    "expires_in": 1800,
+    "user": {
+        "id": "123e4567-e89b-12d3-a456-426614174000",
+        "employee_code": "NUR001",
+        "email": "nurse@hospital.com",
+        "first_name": "فاطمه",
+        "last_name": "احمدی",
+        "role": "nurse",
+        "is_active": True
+    }
+}
+
+
+def _validate_email(v: Optional[str]) -> Optional[str]:
+    """بررسی فرمت ایمیل و نرمال‌سازی دامنه (مشابه EmailStr)"""
+    if v is None:
+        return v
+    v = unicodedata.normalize("NFC", v.strip())
+    if not _EMAIL_RE.match(v):
+        raise ValueError("فرمت ایمیل نامعتبر است")
+    local, _, domain = v.rpartition("@")
+    return f"{local}@{domain.lower()}"
+
+
 # ========================================
 # Base Schema (مشترک)
 # ========================================
@@ -27,7 +86,7 @@ class UserBase(BaseModel):
     Schema پایه برای User
     حاوی فیلدهای مشترک بین تمام schemas
     """
-    email: EmailStr = Field(
+    email: str = Field(
         ...,
         description="ایمیل کاربر",
         example="nurse@hospital.com"
@@ -120,6 +179,12 @@ class UserCreate(UserBase):
         if not v.isalnum():
             raise ValueError("کد پرسنلی فقط باید شامل حروف و اعداد باشد")
         return v.upper()
+    
+    @field_validator("email")
+    @classmethod
+    def validate_email(cls, v):
+        """اعتبارسنجی ایمیل (همان قاعده ورود و ویرایش)"""
+        return _validate_email(v)
 
 
 # ========================================
@@ -132,7 +197,7 @@ class UserLogin(BaseModel):
     
     استفاده در endpoint: POST /api/v1/auth/login
     """
-    email: EmailStr = Field(
+    email: str = Field(
         ...,
         description="ایمیل کاربر",
         example="nurse@hospital.com"
@@ -142,6 +207,12 @@ class UserLogin(BaseModel):
         description="رمز عبور",
         example="SecurePass123!"
     )
+    
+    @field_validator("email")
+    @classmethod
+    def validate_email(cls, v):
+        """اعتبارسنجی سبک ایمیل (فقط برای lookup در دیتابیس)"""
+        return _validate_email(v)
 
 
 # ========================================
@@ -167,7 +238,7 @@ class UserUpdate(BaseModel):
         max_length=100,
         description="نام خانوادگی"
     )
-    email: Optional[EmailStr] = Field(
+    email: Optional[str] = Field(
         None,
         description="ایمیل"
     )
@@ -186,6 +257,12 @@ class UserUpdate(BaseModel):
         max_length=500,
         description="توضیحات"
     )
+    
+    @field_validator("email")
+    @classmethod
+    def validate_email(cls, v):
+        """اعتبارسنجی سبک ایمیل"""
+        return _validate_email(v)
 
 
 # ========================================
@@ -207,26 +284,10 @@ class UserResponse(UserBase):
     created_at: datetime = Field(..., description="زمان ایجاد")
     updated_at: datetime = Field(..., description="زمان آپدیت")
     
-    class Config:
-        """تنظیمات Pydantic"""
-        from_attributes = True  # برای خواندن از ORM models
-        json_schema_extra = {
-            "example": {
-                "id": "123e4567-e89b-12d3-a456-426614174000",
-                "employee_code": "NUR001",
-                "email": "nurse@hospital.com",
-                "first_name": "فاطمه",
-                "last_name": "احمدی",
-                "phone_number": "09123456789",
-                "department": "ICU",
-                "role": "nurse",
-                "is_active": True,
-                "bio": "پرستار بخش مراقبت‌های ویژه",
-                "last_login": "2024-11-19T10:30:00Z",
-                "created_at": "2024-01-15T08:00:00Z",
-                "updated_at": "2024-11-19T10:30:00Z"
-            }
-        }
+    model_config = ConfigDict(
+        from_attributes=True,  # برای خواندن از ORM models
+        json_schema_extra={"example": _USER_RESPONSE_EXAMPLE}
+    )
 
 
 # ========================================
@@ -289,24 +350,9 @@ class TokenResponse(BaseModel):
     expires_in: int = Field(..., description="مدت اعتبار (ثانیه)")
     user: UserResponse = Field(..., description="اطلاعات کاربر")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "access_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
-                "refresh_token": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9...",
-                "token_type": "bearer",
-                "expires_in": 1800,
-                "user": {
-                    "id": "123e4567-e89b-12d3-a456-426614174000",
-                    "employee_code": "NUR001",
-                    "email": "nurse@hospital.com",
-                    "first_name": "فاطمه",
-                    "last_name": "احمدی",
-                    "role": "nurse",
-                    "is_active": True
-                }
-            }
-        }
+    model_config = ConfigDict(
+        json_schema_extra={"example": _TOKEN_RESPONSE_EXAMPLE}
+    )
 
 
 # ========================================
@@ -2,11 +2,14 @@
 Services Package
 """
 from app.services.auth_service import AuthService
+from app.services.storage_service import StorageService, storage_service
 from app.services.voice_service import VoiceService, voice_service
 from app.services.report_service import ReportService
 
 __all__ = [
     "AuthService",
+    "StorageService",
+    "storage_service",
     "VoiceService",
     "voice_service",
     "ReportService",
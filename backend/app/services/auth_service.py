@@ -11,21 +11,79 @@ Authentication Service
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import Any, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.orm import defer, raiseload
 from fastapi import HTTPException, status
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin, TokenResponse, PasswordChange
 from app.core.security import (
-    hash_password,
-    verify_password,
+    hash_password_async,
+    verify_password_async,
+    verify_password_and_update_async,
     create_tokens_pair,
     check_password_strength
 )
 
 
+# ========================================
+# Loader options برای lookup کاربر فعلی
+# ========================================
+# در مسیر احراز هویت فقط ستون‌های هویتی/پروفایل لازم است:
+# - لیست گزارشات کاربر (selectin) بارگذاری نمی‌شود
+# - hashed_password از دیتابیس خوانده نمی‌شود
+_CURRENT_USER_OPTIONS = (
+    raiseload(User.reports),
+    raiseload(User.reviewed_reports),
+    defer(User.hashed_password, raiseload=True),
+)
+
+
+# ستون‌های لازم برای login (بدون hydrate کردن ORM object و روابط آن)
+_LOGIN_COLUMNS = (
+    User.id,
+    User.hashed_password,
+    User.is_active,
+    User.email,
+    User.first_name,
+    User.last_name,
+    User.role,
+    User.employee_code,
+    User.department,
+    User.phone_number,
+    User.bio,
+    User.last_login,
+    User.created_at,
+    User.updated_at,
+)
+
+
+def _user_response_dict(user: Any) -> dict:
+    """
+    ساخت dict پاسخ کاربر (هم‌شکل UserResponse) از ORM object یا Row
+    
+    در مسیر login از validation دوباره Pydantic جلوگیری می‌کند؛
+    فیلدهای datetime به همان شکل باقی می‌مانند تا encoder JSON آن‌ها را سریال کند.
+    """
+    return {
+        "id": user.id,
+        "employee_code": user.employee_code,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "phone_number": user.phone_number,
+        "department": user.department,
+        "role": user.role.value,
+        "is_active": user.is_active,
+        "bio": user.bio,
+        "last_login": user.last_login,
+        "created_at": user.created_at,
+        "updated_at": user.updated_at,
+    }
+
+
 class AuthService:
     """
     سرویس احراز هویت
@@ -82,7 +140,7 @@ class AuthService:
             )
         
         # Hash کردن password
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await hash_password_async(user_data.password)
         
         # ایجاد کاربر جدید
         new_user = User(
@@ -107,7 +165,7 @@ class AuthService:
     async def login_user(
         login_data: UserLogin,
         db: AsyncSession
-    ) -> TokenResponse:
+    ) -> dict:
         """
         ورود کاربر و صدور token
         
@@ -123,16 +181,16 @@ class AuthService:
             db: session دیتابیس
             
         Returns:
-            TokenResponse: حاوی tokens و اطلاعات کاربر
+            dict: هم‌شکل TokenResponse، حاوی tokens و اطلاعات کاربر
             
         Raises:
             HTTPException: در صورت اشتباه بودن email یا password
         """
-        # یافتن کاربر
+        # یافتن کاربر (فقط ستون‌های لازم، به صورت Row سبک)
         result = await db.execute(
-            select(User).where(User.email == login_data.email)
+            select(*_LOGIN_COLUMNS).where(User.email == login_data.email)
         )
-        user = result.scalar_one_or_none()
+        user = result.first()
         
         if not user:
             raise HTTPException(
@@ -141,8 +199,12 @@ class AuthService:
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
-        # بررسی password
-        if not verify_password(login_data.password, user.hashed_password):
+        # بررسی password (hash جدید فقط در صورت منسوخ بودن تنظیمات hash)
+        is_valid, new_hashed_password = await verify_password_and_update_async(
+            login_data.password,
+            user.hashed_password
+        )
+        if not is_valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="ایمیل یا رمز عبور اشتباه است",
@@ -156,24 +218,32 @@ class AuthService:
                 detail="حساب کاربری شما غیرفعال شده است"
             )
         
-        # ثبت زمان ورود
-        user.last_login = datetime.utcnow()
+        # ثبت زمان ورود (و hash جدید در همان statement)؛
+        # مقادیر ذخیره شده timestamps (از جمله updated_at با onupdate) با RETURNING
+        values = {"last_login": datetime.utcnow()}
+        if new_hashed_password:
+            values["hashed_password"] = new_hashed_password
+        update_result = await db.execute(
+            update(User)
+            .where(User.id == user.id)
+            .values(**values)
+            .returning(User.last_login, User.updated_at)
+        )
+        timestamps = update_result.one()
         await db.commit()
         
         # صدور tokens
         tokens = create_tokens_pair(user.id)
         
-        # ایجاد response
-        from app.schemas.user import UserResponse
-        user_response = UserResponse.model_validate(user)
+        # ایجاد response (بدون ساخت TokenResponse؛ router مستقیماً سریال می‌کند)
+        user_dict = _user_response_dict(user)
+        user_dict["last_login"] = timestamps.last_login
+        user_dict["updated_at"] = timestamps.updated_at
         
-        return TokenResponse(
-            access_token=tokens["access_token"],
-            refresh_token=tokens["refresh_token"],
-            token_type=tokens["token_type"],
-            expires_in=tokens["expires_in"],
-            user=user_response
-        )
+        return {
+            **tokens,
+            "user": user_dict
+        }
     
     @staticmethod
     async def get_current_user(
@@ -195,11 +265,10 @@ class AuthService:
         Raises:
             HTTPException: اگر کاربر یافت نشود
         """
-        result = await db.execute(
-            select(User).where(User.id == user_id)
-        )
-        user = result.scalar_one_or_none()
-        
+        # db.get ابتدا identity map را بررسی می‌کند و فقط در صورت نیاز query می‌زند؛
+        # روابط و hashed_password هیدریت نمی‌شوند
+        user = await db.get(User, user_id, options=_CURRENT_USER_OPTIONS)
+
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -241,30 +310,37 @@ class AuthService:
         Raises:
             HTTPException: در صورت اشتباه بودن رمز فعلی
         """
-        # یافتن کاربر
+        # دریافت hash فعلی (بدون ساخت ORM object)
         result = await db.execute(
-            select(User).where(User.id == user_id)
+            select(User.hashed_password).where(User.id == user_id)
         )
-        user = result.scalar_one_or_none()
+        current_hashed_password = result.scalar_one_or_none()
         
-        if not user:
+        if current_hashed_password is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="کاربر یافت نشد"
             )
         
         # بررسی رمز فعلی
-        if not verify_password(password_data.old_password, user.hashed_password):
+        if not await verify_password_async(
+            password_data.old_password,
+            current_hashed_password
+        ):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="رمز عبور فعلی اشتباه است"
             )
         
         # Hash کردن رمز جدید
-        new_hashed_password = hash_password(password_data.new_password)
+        new_hashed_password = await hash_password_async(password_data.new_password)
         
-        # ذخیره
-        user.hashed_password = new_hashed_password
+        # ذخیره با یک UPDATE مستقیم (بدون ORM flush)
+        await db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(hashed_password=new_hashed_password)
+        )
         await db.commit()
         
         return {"message": "رمز عبور با موفقیت تغییر کرد"}
@@ -287,11 +363,11 @@ class AuthService:
         Raises:
             HTTPException: اگر refresh token نامعتبر باشد
         """
-        from app.core.security import decode_token
+        from app.core.security import decode_token_cached
         
         # decode کردن refresh token
         try:
-            payload = decode_token(refresh_token)
+            payload = decode_token_cached(refresh_token)
         except HTTPException:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -6,7 +6,7 @@ Report Service
 
 عملیات:
 - ایجاد گزارش متنی
-- ایجاد گزارش صوتی (با تبدیل به متن)
+- ایجاد گزارش صوتی (با تبدیل به متن، یکجا یا تدریجی)
 - ویرایش گزارش
 - حذف گزارش
 - دریافت لیست گزارشات
@@ -14,23 +14,124 @@ Report Service
 ================================================================================
 """
 
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
+import asyncio
+import base64
+import json
+import uuid
+from datetime import datetime, time, timedelta
+from typing import Any, AsyncIterator, Optional, Tuple
+from cachetools import LRUCache, TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
+from sqlalchemy import Row, delete, select, update, func, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer, joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException, status, UploadFile
 
+from app.core.config import settings
 from app.models.report import Report, ReportStatus, ReportType
 from app.models.user import User
 from app.schemas.report import (
     ReportCreate,
     ReportUpdate,
     VoiceReportCreate,
+    VoiceReportFromStorage,
+    VoiceUploadUrlRequest,
+    VoiceUploadUrlResponse,
     ReportStatistics
 )
+from app.services.storage_service import storage_service
 from app.services.voice_service import voice_service
 
 
+# ========================================
+# ستون‌های لیست گزارشات
+# ========================================
+# هم‌شکل ReportSummary؛ created_at و id برای cursor نیز لازم‌اند
+_SUMMARY_COLUMNS = (
+    Report.id,
+    Report.patient_name,
+    Report.status,
+    Report.report_type,
+    Report.created_at,
+    Report.is_transcribed,
+)
+
+
+# ========================================
+# Loader options برای جزئیات گزارش
+# ========================================
+# پرستار و بررسی‌کننده (many-to-one) در همان query با JOIN بارگذاری می‌شوند؛
+# لیست گزارشات آن‌ها (که به صورت پیش‌فرض selectin است) و hashed_password
+# بارگذاری نمی‌شوند.
+def _user_relation_options(loader) -> tuple:
+    """ساخت loader options برای nurse/reviewer با strategy داده شده"""
+    return tuple(
+        loader(relation).options(
+            raiseload(User.reports),
+            raiseload(User.reviewed_reports),
+            defer(User.hashed_password, raiseload=True),
+        )
+        for relation in (Report.nurse, Report.reviewer)
+    )
+
+
+_REPORT_DETAIL_OPTIONS = _user_relation_options(joinedload)
+
+# UPDATE ... RETURNING با JOIN ترکیب نمی‌شود؛ روابط با SELECT ... IN جداگانه
+_REPORT_RETURNING_OPTIONS = _user_relation_options(selectinload)
+
+
+# ========================================
+# Cursor (keyset pagination)
+# ========================================
+
+def _encode_cursor(report: Row) -> str:
+    """ساخت cursor مات (base64 از JSON) از (created_at, id) آخرین ردیف"""
+    raw = json.dumps([report.created_at.isoformat(), report.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    بازکردن cursor به (created_at, id)
+    
+    Raises:
+        HTTPException: اگر cursor نامعتبر باشد
+    """
+    try:
+        created_at, report_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(created_at)
+        # created_at در دیتابیس timezone-aware است؛ مقایسه با datetime بدون tzinfo خطا می‌دهد
+        if created_at.tzinfo is None:
+            raise ValueError("naive datetime")
+        return created_at, str(report_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="cursor نامعتبر است"
+        )
+
+
+# ========================================
+# Cache آمار (TTL کوتاه، به ازای هر پرستار)
+# ========================================
+# آمار داشبورد در هر refresh دوباره محاسبه نمی‌شود؛ با هر تغییر در
+# گزارشات یک پرستار، ورودی او از cache حذف می‌شود.
+_statistics_cache: TTLCache = TTLCache(
+    maxsize=10_000,
+    ttl=settings.STATISTICS_CACHE_TTL
+)
+
+# یک lock برای هر کاربر تا در cache miss فقط یک query اجرا شود (single-flight)
+_statistics_locks: LRUCache = LRUCache(maxsize=10_000)
+
+
+def _invalidate_statistics(user_id: str) -> None:
+    """حذف آمار cache شده یک کاربر پس از تغییر گزارشاتش"""
+    _statistics_cache.pop(user_id, None)
+
+
 class ReportService:
     """
     سرویس گزارشات
@@ -38,6 +139,17 @@ class ReportService:
     تمام منطق business مربوط به گزارشات در این کلاس است.
     """
     
+    @staticmethod
+    def _attach_relations(report: Report, user: User) -> None:
+        """
+        مقداردهی روابط گزارش تازه ایجاد شده بدون query اضافه
+        
+        سازنده گزارش همان کاربر فعلی است و گزارش جدید بررسی‌کننده ندارد؛
+        set_committed_value رویداد backref (و بارگذاری User.reports) را فعال نمی‌کند.
+        """
+        set_committed_value(report, "nurse", user)
+        set_committed_value(report, "reviewer", None)
+    
     @staticmethod
     async def create_text_report(
         report_data: ReportCreate,
@@ -69,7 +181,8 @@ class ReportService:
         
         db.add(new_report)
         await db.commit()
-        await db.refresh(new_report)
+        ReportService._attach_relations(new_report, user)
+        _invalidate_statistics(user.id)
         
         return new_report
     
@@ -84,9 +197,12 @@ class ReportService:
         ایجاد گزارش صوتی و تبدیل به متن
         
         مراحل:
-        1. ایجاد رکورد اولیه در دیتابیس
+        1. تولید شناسه گزارش در سمت client
         2. پردازش فایل صوتی (ذخیره و تبدیل)
-        3. آپدیت گزارش با نتایج
+        3. ذخیره گزارش کامل در دیتابیس با یک commit
+        
+        اگر پردازش صوت ناموفق باشد هیچ ردیفی در دیتابیس ایجاد نمی‌شود؛
+        اگر ذخیره در دیتابیس ناموفق باشد فایل صوتی ذخیره شده حذف می‌شود.
         
         Args:
             audio_file: فایل صوتی
@@ -100,52 +216,260 @@ class ReportService:
         Raises:
             HTTPException: در صورت خطا در پردازش
         """
-        # 1. ایجاد رکورد اولیه
-        new_report = Report(
-            nurse_id=user.id,
-            patient_name=report_data.patient_name,
-            patient_national_id=report_data.patient_national_id,
-            patient_file_number=report_data.patient_file_number,
-            content="",  # خالی - بعداً پر می‌شود
-            notes=report_data.notes,
-            report_type=ReportType.VOICE,
-            status=ReportStatus.DRAFT,
-            is_transcribed=False
+        # 1. شناسه گزارش (برای نام فایل صوتی، پیش از insert)
+        report_id = str(uuid.uuid4())
+        
+        # 2. پردازش صوت (در صورت خطا، voice_service فایل ذخیره شده را حذف می‌کند)
+        try:
+            voice_result = await voice_service.process_voice_report(
+                audio_file,
+                report_id,
+                persist=settings.STORE_AUDIO_FILES
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"خطا در پردازش فایل صوتی: {str(e)}"
+            )
+        
+        # 3. ذخیره گزارش کامل
+        return await ReportService._save_voice_report(
+            report_id, report_data, voice_result, user, db
         )
+    
+    @staticmethod
+    async def create_voice_report_stream(
+        audio_file: UploadFile,
+        report_data: VoiceReportCreate,
+        user: User,
+        db: AsyncSession
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        ایجاد گزارش صوتی با ارسال تدریجی متن تبدیل شده
         
-        db.add(new_report)
-        await db.commit()
-        await db.refresh(new_report)
+        مانند create_voice_report است؛ segment های متن به محض آماده شدن و
+        در پایان گزارش ذخیره شده ارسال می‌شوند.
         
+        Yields:
+            Tuple[str, Any]: ("segment", {start, end, text}) و در پایان ("report", Report)
+            
+        Raises:
+            HTTPException: در صورت خطا در پردازش
+        """
+        report_id = str(uuid.uuid4())
+        
+        voice_result = None
         try:
-            # 2. پردازش صوت
-            voice_result = await voice_service.process_voice_report(
+            async for event, data in voice_service.stream_voice_report(
                 audio_file,
-                new_report.id
+                report_id,
+                persist=settings.STORE_AUDIO_FILES
+            ):
+                if event == "segment":
+                    yield event, data
+                else:
+                    voice_result = data
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"خطا در پردازش فایل صوتی: {str(e)}"
             )
+        
+        yield "report", await ReportService._save_voice_report(
+            report_id, report_data, voice_result, user, db
+        )
+    
+    @staticmethod
+    async def create_voice_upload_url(
+        upload_request: VoiceUploadUrlRequest,
+        user: User
+    ) -> VoiceUploadUrlResponse:
+        """
+        ساخت لینک آپلود مستقیم فایل صوتی به object storage
+        
+        Args:
+            upload_request: پسوند فایل
+            user: کاربر درخواست‌دهنده
             
-            # 3. آپدیت گزارش با نتایج
-            new_report.content = voice_result["transcribed_text"]
-            new_report.audio_file_path = voice_result["file_path"]
-            new_report.audio_size = voice_result["file_size"]
-            new_report.audio_duration = voice_result["duration"]
-            new_report.is_transcribed = True
-            new_report.transcription_confidence = voice_result["confidence"]
+        Returns:
+            VoiceUploadUrlResponse: لینک آپلود و object key
             
-            await db.commit()
-            await db.refresh(new_report)
+        Raises:
+            HTTPException: اگر فرمت فایل مجاز نباشد یا object storage فعال نباشد
+        """
+        file_extension = upload_request.file_extension.lstrip(".").lower()
+        ReportService._check_audio_format(file_extension)
+        
+        object_key = storage_service.build_object_key(
+            user.id, str(uuid.uuid4()), file_extension
+        )
+        content_type = f"audio/{file_extension}"
+        upload = await storage_service.create_presigned_upload(
+            object_key, content_type, voice_service.MAX_FILE_SIZE
+        )
+        
+        return VoiceUploadUrlResponse(
+            upload_url=upload["upload_url"],
+            upload_fields=upload["upload_fields"],
+            object_key=object_key,
+            content_type=content_type,
+            expires_in=upload["expires_in"]
+        )
+    
+    @staticmethod
+    async def create_voice_report_from_storage(
+        report_data: VoiceReportFromStorage,
+        user: User,
+        db: AsyncSession
+    ) -> Report:
+        """
+        ایجاد گزارش صوتی از فایلی که client مستقیماً در object storage آپلود کرده
+        
+        فایل روی دیسک سرور ذخیره نمی‌شود؛ audio_file_path به صورت
+        s3://bucket/key نگهداری می‌شود.
+        
+        Args:
+            report_data: اطلاعات گزارش و object key
+            user: کاربر ایجادکننده
+            db: session دیتابیس
             
-            return new_report
+        Returns:
+            Report: گزارش ایجاد شده
             
+        Raises:
+            HTTPException 409: اگر گزارشی با این object key قبلاً ثبت شده باشد
+            HTTPException: در صورت نامعتبر بودن object key یا خطا در پردازش
+        """
+        report_id, file_extension = storage_service.parse_object_key(
+            report_data.object_key, user.id
+        )
+        ReportService._check_audio_format(file_extension)
+        
+        # ارسال دوباره همان object key (تلاش مجدد client): فایل متعلق به گزارش موجود است
+        existing_id = await db.scalar(select(Report.id).where(Report.id == report_id))
+        if existing_id is not None:
+            ReportService._raise_duplicate_report()
+        
+        data = await storage_service.read_object(
+            report_data.object_key,
+            voice_service.MAX_FILE_SIZE
+        )
+        object_uri = storage_service.object_uri(report_data.object_key)
+        
+        try:
+            voice_service.check_audio_signature(data, file_extension)
+        except HTTPException:
+            await voice_service.delete_audio_file(object_uri)
+            raise
+        
+        try:
+            transcription = await voice_service.transcribe_audio_bytes(
+                data,
+                file_extension
+            )
+        except HTTPException:
+            # فایل بدون گزارش باقی نماند
+            await voice_service.delete_audio_file(object_uri)
+            raise
         except Exception as e:
-            # در صورت خطا، گزارش را حذف می‌کنیم
-            await db.delete(new_report)
-            await db.commit()
-            
+            await voice_service.delete_audio_file(object_uri)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"خطا در پردازش فایل صوتی: {str(e)}"
             )
+        
+        voice_result = {
+            "file_path": object_uri,
+            "file_size": len(data),
+            "transcribed_text": transcription["text"],
+            "confidence": transcription["confidence"],
+            "duration": transcription["duration"],
+        }
+        return await ReportService._save_voice_report(
+            report_id, report_data, voice_result, user, db
+        )
+    
+    @staticmethod
+    def _check_audio_format(file_extension: str) -> None:
+        """
+        Raises:
+            HTTPException 400: اگر فرمت فایل مجاز نباشد
+        """
+        if file_extension not in voice_service.ALLOWED_FORMATS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"فرمت فایل باید یکی از {', '.join(sorted(voice_service.ALLOWED_FORMATS))} باشد"
+            )
+    
+    @staticmethod
+    async def _save_voice_report(
+        report_id: str,
+        report_data: VoiceReportCreate,
+        voice_result: dict,
+        user: User,
+        db: AsyncSession
+    ) -> Report:
+        """
+        ذخیره گزارش صوتی کامل (پس از تبدیل به متن) با یک commit
+        
+        اگر ذخیره در دیتابیس ناموفق باشد فایل صوتی حذف می‌شود؛ به جز تکراری بودن
+        شناسه گزارش (ارسال همزمان همان object key) که فایل متعلق به گزارش موجود است.
+        
+        Raises:
+            HTTPException 409: اگر گزارشی با همین شناسه وجود داشته باشد
+        """
+        new_report = Report(
+            id=report_id,
+            nurse_id=user.id,
+            patient_name=report_data.patient_name,
+            patient_national_id=report_data.patient_national_id,
+            patient_file_number=report_data.patient_file_number,
+            content=voice_result["transcribed_text"],
+            notes=report_data.notes,
+            report_type=ReportType.VOICE,
+            status=ReportStatus.DRAFT,
+            audio_file_path=voice_result["file_path"],
+            audio_size=voice_result["file_size"],
+            audio_duration=voice_result["duration"],
+            is_transcribed=True,
+            transcription_confidence=voice_result["confidence"]
+        )
+        
+        try:
+            db.add(new_report)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            # فایل object storage با کلید client متعلق به گزارش موجود است و حذف نمی‌شود
+            file_path = voice_result["file_path"]
+            if file_path and not storage_service.is_object_uri(file_path):
+                await voice_service.delete_audio_file(file_path)
+            ReportService._raise_duplicate_report()
+        except Exception:
+            # فایل بدون گزارش باقی نماند
+            if voice_result["file_path"]:
+                await voice_service.delete_audio_file(voice_result["file_path"])
+            raise
+        
+        ReportService._attach_relations(new_report, user)
+        _invalidate_statistics(user.id)
+        
+        return new_report
+    
+    @staticmethod
+    def _raise_duplicate_report() -> None:
+        """
+        Raises:
+            HTTPException 409: گزارش با این شناسه قبلاً ثبت شده است
+        """
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="این گزارش قبلاً ثبت شده است"
+        )
     
     @staticmethod
     async def get_report_by_id(
@@ -162,10 +486,45 @@ class ReportService:
         Returns:
             Optional[Report]: گزارش یا None
         """
+        # db.get ابتدا identity map را بررسی می‌کند و فقط در صورت نیاز query می‌زند
+        return await db.get(Report, report_id, options=_REPORT_DETAIL_OPTIONS)
+    
+    @staticmethod
+    def _ownership_criteria(report_id: str, user: User) -> list:
+        """
+        شرط WHERE برای گزارشی که کاربر اجازه تغییر آن را دارد
+        (فقط سازنده یا admin)
+        """
+        criteria = [Report.id == report_id]
+        if not user.is_admin():
+            criteria.append(Report.nurse_id == user.id)
+        return criteria
+    
+    @staticmethod
+    async def _raise_not_found_or_forbidden(
+        report_id: str,
+        db: AsyncSession,
+        forbidden_detail: str
+    ) -> None:
+        """
+        تشخیص 404 از 403 وقتی UPDATE/DELETE هیچ ردیفی را تغییر نداده است
+        
+        Raises:
+            HTTPException 404: اگر گزارش وجود نداشته باشد
+            HTTPException 403: اگر گزارش متعلق به کاربر دیگری باشد
+        """
         result = await db.execute(
-            select(Report).where(Report.id == report_id)
+            select(select(Report.id).where(Report.id == report_id).exists())
+        )
+        if not result.scalar():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="گزارش یافت نشد"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=forbidden_detail
         )
-        return result.scalar_one_or_none()
     
     @staticmethod
     async def update_report(
@@ -177,6 +536,9 @@ class ReportService:
         """
         ویرایش گزارش
         
+        بررسی دسترسی در شرط WHERE همان UPDATE انجام می‌شود؛ در مسیر موفق
+        فقط یک statement (UPDATE ... RETURNING) اجرا می‌شود.
+        
         Args:
             report_id: شناسه گزارش
             update_data: داده‌های جدید
@@ -189,28 +551,39 @@ class ReportService:
         Raises:
             HTTPException: اگر گزارش یافت نشود یا دسترسی نباشد
         """
-        report = await ReportService.get_report_by_id(report_id, db)
+        forbidden_detail = "شما اجازه ویرایش این گزارش را ندارید"
+        criteria = ReportService._ownership_criteria(report_id, user)
+        update_dict = update_data.model_dump(exclude_unset=True)
         
-        if not report:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="گزارش یافت نشد"
+        # بدون فیلد برای ویرایش: فقط بررسی وجود و دسترسی
+        if not update_dict:
+            result = await db.execute(
+                select(Report).where(*criteria).options(*_REPORT_DETAIL_OPTIONS)
             )
+            report = result.scalar_one_or_none()
+            if report is None:
+                await ReportService._raise_not_found_or_forbidden(
+                    report_id, db, forbidden_detail
+                )
+            return report
         
-        # بررسی دسترسی (فقط سازنده یا admin)
-        if report.nurse_id != user.id and not user.is_admin:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="شما اجازه ویرایش این گزارش را ندارید"
-            )
+        # آپدیت فیلدها (فقط اگر کاربر مجاز باشد)
+        result = await db.execute(
+            update(Report)
+            .where(*criteria)
+            .values(**update_dict)
+            .returning(Report)
+            .options(*_REPORT_RETURNING_OPTIONS)
+        )
+        report = result.scalar_one_or_none()
         
-        # آپدیت فیلدها
-        update_dict = update_data.model_dump(exclude_unset=True)
-        for field, value in update_dict.items():
-            setattr(report, field, value)
+        if report is None:
+            await ReportService._raise_not_found_or_forbidden(
+                report_id, db, forbidden_detail
+            )
         
         await db.commit()
-        await db.refresh(report)
+        _invalidate_statistics(report.nurse_id)
         
         return report
     
@@ -223,6 +596,9 @@ class ReportService:
         """
         حذف گزارش
         
+        بررسی دسترسی در شرط WHERE همان DELETE انجام می‌شود؛ در مسیر موفق
+        فقط یک statement (DELETE ... RETURNING) اجرا می‌شود.
+        
         Args:
             report_id: شناسه گزارش
             user: کاربر درخواست‌دهنده
@@ -234,28 +610,26 @@ class ReportService:
         Raises:
             HTTPException: اگر گزارش یافت نشود یا دسترسی نباشد
         """
-        report = await ReportService.get_report_by_id(report_id, db)
+        # حذف از دیتابیس (فقط اگر کاربر مجاز باشد)
+        result = await db.execute(
+            delete(Report)
+            .where(*ReportService._ownership_criteria(report_id, user))
+            .returning(Report.nurse_id, Report.audio_file_path)
+        )
+        deleted = result.first()
         
-        if not report:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="گزارش یافت نشد"
+        if deleted is None:
+            await ReportService._raise_not_found_or_forbidden(
+                report_id, db, "شما اجازه حذف این گزارش را ندارید"
             )
         
-        # بررسی دسترسی
-        if report.nurse_id != user.id and not user.is_admin:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="شما اجازه حذف این گزارش را ندارید"
-            )
+        await db.commit()
         
-        # حذف فایل صوتی (اگر وجود دارد)
-        if report.audio_file_path:
-            await voice_service.delete_audio_file(report.audio_file_path)
+        # حذف فایل صوتی (اگر وجود دارد) پس از commit موفق
+        if deleted.audio_file_path:
+            await voice_service.delete_audio_file(deleted.audio_file_path)
         
-        # حذف از دیتابیس
-        await db.delete(report)
-        await db.commit()
+        _invalidate_statistics(deleted.nurse_id)
         
         return {"message": "گزارش با موفقیت حذف شد"}
     
@@ -266,46 +640,80 @@ class ReportService:
         skip: int = 0,
         limit: int = 10,
         status_filter: Optional[ReportStatus] = None,
-        type_filter: Optional[ReportType] = None
-    ) -> Tuple[list[Report], int]:
+        type_filter: Optional[ReportType] = None,
+        cursor: Optional[str] = None
+    ) -> Tuple[list[Row], int, Optional[str]]:
         """
         دریافت لیست گزارشات کاربر
         
+        اگر cursor داده شود از keyset pagination روی (created_at, id) استفاده
+        می‌شود و skip نادیده گرفته می‌شود؛ هزینه هر صفحه مستقل از عمق صفحه است.
+        در غیر این صورت مسیر قدیمی offset/limit اجرا می‌شود.
+        
         Args:
             user: کاربر
             db: session دیتابیس
-            skip: تعداد skip
+            skip: تعداد skip (فقط در حالت offset)
             limit: تعداد limit
             status_filter: فیلتر وضعیت (اختیاری)
             type_filter: فیلتر نوع (اختیاری)
+            cursor: cursor صفحه بعد از پاسخ قبلی (اختیاری)
             
         Returns:
-            Tuple[list[Report], int]: لیست گزارشات و تعداد کل
+            Tuple[list[Row], int, Optional[str]]:
+                لیست خلاصه گزارشات (ستون‌های _SUMMARY_COLUMNS)، تعداد کل
+                و cursor صفحه بعد (یا None)
         """
-        # Query پایه
-        query = select(Report).where(Report.nurse_id == user.id)
+        # فیلترهای مشترک بین query شمارش و query ردیف‌ها
+        filters = [Report.nurse_id == user.id]
         
-        # اعمال فیلترها
         if status_filter:
-            query = query.where(Report.status == status_filter)
+            filters.append(Report.status == status_filter)
         
         if type_filter:
-            query = query.where(Report.report_type == type_filter)
+            filters.append(Report.report_type == type_filter)
         
-        # مرتب‌سازی (جدیدترین اول)
-        query = query.order_by(Report.created_at.desc())
+        # تعداد کل (COUNT مستقیم، بدون subquery و ORDER BY)
+        count_query = select(func.count()).select_from(Report).where(*filters)
         
-        # تعداد کل
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
+        # دریافت گزارشات (جدیدترین اول؛ id برای ترتیب یکتا)
+        # فقط ستون‌های لازم برای لیست؛ بدون content/notes و بدون ORM entity
+        query = (
+            select(*_SUMMARY_COLUMNS)
+            .where(*filters)
+            .order_by(Report.created_at.desc(), Report.id.desc())
+        )
+        
+        if cursor:
+            cursor_created_at, cursor_id = _decode_cursor(cursor)
+            query = query.where(
+                or_(
+                    Report.created_at < cursor_created_at,
+                    and_(
+                        Report.created_at == cursor_created_at,
+                        Report.id < cursor_id
+                    )
+                )
+            )
+        else:
+            query = query.offset(skip)
+        
+        # یک ردیف اضافه برای تشخیص وجود صفحه بعد
+        query = query.limit(limit + 1)
+        
+        # هر دو query روی session همین request (یک AsyncSession هم‌زمان قابل استفاده نیست)
+        count_result = await db.execute(count_query)
+        total = count_result.scalar() or 0
         
-        # دریافت گزارشات
-        query = query.offset(skip).limit(limit)
         result = await db.execute(query)
-        reports = result.scalars().all()
+        reports = list(result.all())
+        
+        next_cursor = None
+        if len(reports) > limit:
+            reports = reports[:limit]
+            next_cursor = _encode_cursor(reports[-1])
         
-        return list(reports), total
+        return reports, total, next_cursor
     
     @staticmethod
     async def get_statistics(
@@ -315,6 +723,9 @@ class ReportService:
         """
         دریافت آمار گزارشات کاربر
         
+        نتیجه برای STATISTICS_CACHE_TTL ثانیه cache می‌شود و با ایجاد،
+        ویرایش یا حذف گزارش کاربر باطل می‌شود.
+        
         Args:
             user: کاربر
             db: session دیتابیس
@@ -322,82 +733,91 @@ class ReportService:
         Returns:
             ReportStatistics: آمار
         """
-        base_filter = Report.nurse_id == user.id
-        
-        # تعداد کل
-        total_result = await db.execute(
-            select(func.count()).select_from(Report).where(base_filter)
-        )
-        total_reports = total_result.scalar() or 0
+        cached = _statistics_cache.get(user.id)
+        if cached is not None:
+            return cached
+        
+        lock = _statistics_locks.get(user.id)
+        if lock is None:
+            lock = _statistics_locks[user.id] = asyncio.Lock()
+        
+        async with lock:
+            # ممکن است درخواست هم‌زمان دیگری cache را پر کرده باشد
+            cached = _statistics_cache.get(user.id)
+            if cached is not None:
+                return cached
+            
+            statistics = await ReportService._compute_statistics(user, db)
+            _statistics_cache[user.id] = statistics
+            return statistics
+    
+    @staticmethod
+    async def _compute_statistics(
+        user: User,
+        db: AsyncSession
+    ) -> ReportStatistics:
+        """
+        محاسبه آمار گزارشات کاربر از دیتابیس
         
-        # پیش‌نویس‌ها
-        draft_result = await db.execute(
-            select(func.count()).select_from(Report).where(
-                and_(base_filter, Report.status == ReportStatus.DRAFT)
-            )
-        )
-        draft_reports = draft_result.scalar() or 0
+        Args:
+            user: کاربر
+            db: session دیتابیس
+            
+        Returns:
+            ReportStatistics: آمار
+        """
+        now = datetime.now()
+        week_ago = now - timedelta(days=7)
         
-        # نهایی‌ها
-        final_result = await db.execute(
-            select(func.count()).select_from(Report).where(
-                and_(base_filter, Report.status == ReportStatus.FINAL)
-            )
-        )
-        final_reports = final_result.scalar() or 0
+        # بازه نیمه‌باز [امروز 00:00، فردا 00:00) به جای func.date(created_at)
+        # تا index روی created_at قابل استفاده باشد
+        today_start = datetime.combine(now.date(), time.min)
+        today_end = today_start + timedelta(days=1)
         
-        # بررسی شده‌ها
-        reviewed_result = await db.execute(
-            select(func.count()).select_from(Report).where(
-                and_(base_filter, Report.reviewed_by_id.isnot(None))
+        # تمام شمارنده‌ها در یک query (یک بار اسکن به جای 8 رفت‌وبرگشت)
+        result = await db.execute(
+            select(
+                func.count().label("total"),
+                func.count().filter(
+                    Report.status == ReportStatus.DRAFT
+                ).label("draft"),
+                func.count().filter(
+                    Report.status == ReportStatus.FINAL
+                ).label("final"),
+                func.count().filter(
+                    Report.reviewed_by_id.isnot(None)
+                ).label("reviewed"),
+                func.count().filter(
+                    Report.report_type == ReportType.VOICE
+                ).label("voice"),
+                func.count().filter(
+                    Report.created_at >= today_start,
+                    Report.created_at < today_end
+                ).label("today"),
+                func.count().filter(
+                    Report.created_at >= week_ago
+                ).label("week"),
             )
+            .select_from(Report)
+            .where(Report.nurse_id == user.id)
         )
-        reviewed_reports = reviewed_result.scalar() or 0
+        counts = result.one()
         
-        # صوتی
-        voice_result = await db.execute(
-            select(func.count()).select_from(Report).where(
-                and_(base_filter, Report.report_type == ReportType.VOICE)
-            )
-        )
-        voice_reports = voice_result.scalar() or 0
+        total_reports = counts.total or 0
+        voice_reports = counts.voice or 0
         
         # متنی
         text_reports = total_reports - voice_reports
         
-        # امروز
-        today = datetime.now().date()
-        today_result = await db.execute(
-            select(func.count()).select_from(Report).where(
-                and_(
-                    base_filter,
-                    func.date(Report.created_at) == today
-                )
-            )
-        )
-        today_reports = today_result.scalar() or 0
-        
-        # این هفته
-        week_ago = datetime.now() - timedelta(days=7)
-        week_result = await db.execute(
-            select(func.count()).select_from(Report).where(
-                and_(
-                    base_filter,
-                    Report.created_at >= week_ago
-                )
-            )
-        )
-        this_week_reports = week_result.scalar() or 0
-        
         return ReportStatistics(
             total_reports=total_reports,
-            draft_reports=draft_reports,
-            final_reports=final_reports,
-            reviewed_reports=reviewed_reports,
+            draft_reports=counts.draft or 0,
+            final_reports=counts.final or 0,
+            reviewed_reports=counts.reviewed or 0,
             voice_reports=voice_reports,
             text_reports=text_reports,
-            today_reports=today_reports,
-            this_week_reports=this_week_reports
+            today_reports=counts.today or 0,
+            this_week_reports=counts.week or 0
         )
 
 
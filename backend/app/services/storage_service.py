@@ -0,0 +1,241 @@
+"""
+================================================================================
+Storage Service - نگهداری فایل‌های صوتی در Object Storage
+================================================================================
+در حالت AUDIO_STORAGE_BACKEND=s3 فایل صوتی مستقیماً از client به
+S3 (یا سرویس S3-compatible مثل MinIO) آپلود می‌شود و بایت‌های فایل از
+سرور API عبور نمی‌کنند:
+
+1. client یک لینک آپلود موقت (presigned POST با محدودیت سایز) و object key دریافت می‌کند
+2. client فایل را مستقیماً با POST (multipart، همراه fields) به آن لینک ارسال می‌کند
+3. client فقط object key را برای ایجاد گزارش به API می‌فرستد
+
+نیازمند پکیج aioboto3 (فقط در صورت فعال بودن این حالت)؛ نصب از requirements-optional/s3.txt.
+================================================================================
+"""
+
+import uuid
+from typing import Any, Dict, Optional, Tuple
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+# پیشوند مسیر ذخیره شده در audio_file_path برای فایل‌های object storage
+S3_URI_PREFIX = "s3://"
+
+# پیشوند object key فایل‌های صوتی
+AUDIO_KEY_PREFIX = "audio"
+
+
+class StorageService:
+    """
+    سرویس object storage برای فایل‌های صوتی
+    """
+
+    def __init__(self):
+        self._session = None
+
+    @property
+    def enabled(self) -> bool:
+        """آیا نگهداری فایل‌ها در object storage فعال است؟"""
+        return settings.AUDIO_STORAGE_BACKEND == "s3" and bool(settings.S3_BUCKET)
+
+    def _ensure_enabled(self) -> None:
+        """
+        Raises:
+            HTTPException 503: اگر object storage پیکربندی نشده باشد
+        """
+        if not self.enabled:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="آپلود مستقیم فایل صوتی فعال نیست"
+            )
+
+    def _client(self):
+        """ساخت client غیرهمزمان S3 (به صورت async context manager)"""
+        if self._session is None:
+            import aioboto3
+            self._session = aioboto3.Session()
+
+        return self._session.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+        )
+
+    # ========================================
+    # Object Keys
+    # ========================================
+
+    @staticmethod
+    def build_object_key(user_id: str, report_id: str, file_extension: str) -> str:
+        """ساخت object key فایل صوتی یک گزارش"""
+        return f"{AUDIO_KEY_PREFIX}/{user_id}/{report_id}.{file_extension}"
+
+    @staticmethod
+    def parse_object_key(object_key: str, user_id: str) -> Tuple[str, str]:
+        """
+        استخراج (report_id, file_extension) از object key کاربر
+
+        Args:
+            object_key: object key ارسال شده توسط client
+            user_id: شناسه کاربر فعلی
+
+        Returns:
+            Tuple[str, str]: شناسه گزارش و پسوند فایل
+
+        Raises:
+            HTTPException 400: اگر object key متعلق به کاربر نباشد یا نامعتبر باشد
+        """
+        prefix = f"{AUDIO_KEY_PREFIX}/{user_id}/"
+        name = object_key[len(prefix):] if object_key.startswith(prefix) else ""
+        report_id, _, file_extension = name.rpartition(".")
+
+        # شناسه گزارش از client می‌آید: فقط UUID استاندارد (همان قالب build_object_key)
+        try:
+            is_valid_id = str(uuid.UUID(report_id)) == report_id
+        except ValueError:
+            is_valid_id = False
+
+        if not is_valid_id or not file_extension:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="object key نامعتبر است"
+            )
+
+        return report_id, file_extension.lower()
+
+    @staticmethod
+    def object_uri(object_key: str) -> str:
+        """مسیر ذخیره شده در audio_file_path (s3://bucket/key)"""
+        return f"{S3_URI_PREFIX}{settings.S3_BUCKET}/{object_key}"
+
+    @staticmethod
+    def is_object_uri(path: Optional[str]) -> bool:
+        """آیا مسیر به object storage اشاره می‌کند؟"""
+        return bool(path) and path.startswith(S3_URI_PREFIX)
+
+    @staticmethod
+    def _split_uri(uri: str) -> Tuple[str, str]:
+        """تبدیل s3://bucket/key به (bucket, key)"""
+        bucket, _, key = uri[len(S3_URI_PREFIX):].partition("/")
+        return bucket, key
+
+    # ========================================
+    # Operations
+    # ========================================
+
+    async def create_presigned_upload(
+        self,
+        object_key: str,
+        content_type: str,
+        max_size: int
+    ) -> Dict[str, Any]:
+        """
+        ساخت لینک آپلود مستقیم (presigned POST)
+
+        برخلاف presigned PUT، policy فرم POST شرط content-length-range دارد و
+        خود S3 آپلود بزرگ‌تر از max_size را رد می‌کند.
+
+        Args:
+            object_key: object key فایل
+            content_type: نوع محتوای فایل
+            max_size: حداکثر سایز مجاز (بایت)
+
+        Returns:
+            Dict حاوی upload_url، upload_fields و expires_in
+        """
+        self._ensure_enabled()
+
+        async with self._client() as s3:
+            presigned = await s3.generate_presigned_post(
+                Bucket=settings.S3_BUCKET,
+                Key=object_key,
+                Fields={"Content-Type": content_type},
+                Conditions=[
+                    {"Content-Type": content_type},
+                    ["content-length-range", 1, max_size],
+                ],
+                ExpiresIn=settings.S3_PRESIGNED_EXPIRE_SECONDS,
+            )
+
+        return {
+            "upload_url": presigned["url"],
+            "upload_fields": presigned["fields"],
+            "expires_in": settings.S3_PRESIGNED_EXPIRE_SECONDS,
+        }
+
+    async def read_object(self, object_key: str, max_size: int) -> bytes:
+        """
+        خواندن محتوای فایل آپلود شده
+
+        Args:
+            object_key: object key فایل
+            max_size: حداکثر سایز مجاز (بایت)
+
+        Returns:
+            bytes: محتوای فایل
+
+        Raises:
+            HTTPException 404: اگر فایل آپلود نشده باشد
+            HTTPException 413: اگر فایل بزرگ‌تر از حد مجاز باشد (فایل حذف می‌شود)
+        """
+        self._ensure_enabled()
+
+        async with self._client() as s3:
+            try:
+                obj = await s3.get_object(Bucket=settings.S3_BUCKET, Key=object_key)
+            except s3.exceptions.NoSuchKey:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="فایل صوتی آپلود نشده است"
+                )
+
+            async with obj["Body"] as stream:
+                # حداکثر max_size + 1 بایت خوانده می‌شود (حتی اگر ContentLength نباشد)
+                data = b""
+                if obj.get("ContentLength", 0) <= max_size:
+                    data = await stream.read(max_size + 1)
+
+            if obj.get("ContentLength", 0) > max_size or len(data) > max_size:
+                # فایل بزرگ بدون گزارش در bucket باقی نماند
+                await s3.delete_object(Bucket=settings.S3_BUCKET, Key=object_key)
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"سایز فایل نباید بیشتر از {max_size / (1024 * 1024)}MB باشد"
+                )
+
+            return data
+
+    async def delete_object(self, uri: str) -> bool:
+        """
+        حذف فایل از object storage
+
+        Args:
+            uri: مسیر s3://bucket/key
+
+        Returns:
+            bool: True اگر موفق باشد
+        """
+        bucket, key = self._split_uri(uri)
+        try:
+            async with self._client() as s3:
+                await s3.delete_object(Bucket=bucket, Key=key)
+            return True
+        except Exception:
+            return False
+
+
+# ========================================
+# Singleton Instance
+# ========================================
+storage_service = StorageService()
+
+
+# ========================================
+# Export
+# ========================================
+__all__ = ["StorageService", "storage_service"]
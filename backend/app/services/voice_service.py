@@ -12,15 +12,268 @@ Voice-to-Text Service - نسخه آفلاین
 ================================================================================
 """
 
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
 import os
-import aiofiles
+import aiofiles.os
+import platform
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, AsyncIterator, Callable, NamedTuple, Tuple, Union
+import numpy as np
 import whisper
+from cachetools import TTLCache
+from whisper.audio import SAMPLE_RATE
+from anyio import to_thread
 from fastapi import UploadFile, HTTPException, status
 
 from app.core.config import settings
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+
+# ========================================
+# محدودیت همزمانی Transcription
+# ========================================
+# مدل Whisper سنگین است؛ اجرای همزمان نامحدود حافظه و CPU/GPU را اشباع می‌کند
+_transcription_semaphore = asyncio.Semaphore(settings.WHISPER_CONCURRENCY)
+
+
+# ========================================
+# Cache نتایج Transcription (بر اساس hash محتوای فایل)
+# ========================================
+# آپلود دوباره همان فایل (تلاش مجدد client) مدل را دوباره اجرا نمی‌کند.
+# در حالت TRANSCRIPTION_CACHE_BACKEND=redis بین workerها مشترک است.
+_transcription_cache: TTLCache = TTLCache(
+    maxsize=1_000,
+    ttl=max(settings.TRANSCRIPTION_CACHE_TTL, 1)
+)
+
+
+# ========================================
+# بارگذاری مدل Whisper (یک بار برای هر ترکیب موتور/سایز/دستگاه در هر process)
+# ========================================
+class _HFWhisper(NamedTuple):
+    """مدل Whisper با رابط HuggingFace (generate) به همراه processor آن"""
+    model: Any
+    processor: Any
+
+
+@lru_cache(maxsize=4)
+def _load_whisper(backend: str, model_size: str, device: str):
+    """
+    بارگذاری مدل با موتور انتخاب شده
+    
+    نتیجه cache می‌شود؛ ساخت دوباره VoiceService (تست‌ها، reload) وزن‌ها را
+    دوباره از دیسک نمی‌خواند و مدل تکراری در حافظه نمی‌سازد. خطا cache نمی‌شود.
+    
+    Args:
+        backend: openai-whisper یا faster-whisper
+        model_size: سایز مدل
+        device: cpu یا cuda
+        
+    Returns:
+        مدل Whisper (openai-whisper) یا WhisperModel (faster-whisper)
+    """
+    # مسیر وزن‌های مدل (مثلاً یک tmpfs مثل /dev/shm/whisper-cache)
+    download_root = settings.WHISPER_CACHE_DIR
+    
+    if backend == "faster-whisper":
+        from faster_whisper import WhisperModel
+        compute_type = settings.WHISPER_COMPUTE_TYPE
+        if device == "cuda" and compute_type == "int8":
+            # روی GPU: وزن‌های INT8 با activation های FP16 (Tensor Core)
+            compute_type = "int8_float16"
+        # CTranslate2 برای هر worker یک replica دارد و فراخوانی همزمان از چند thread امن است
+        workers = settings.WHISPER_CONCURRENCY
+        return WhisperModel(
+            model_size,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=max((os.cpu_count() or 1) // workers, 1),
+            num_workers=workers,
+            download_root=download_root
+        )
+    
+    if backend == "openvino":
+        # export مدل HuggingFace به OpenVINO IR با وزن‌های INT8 (NNCF)
+        from optimum.intel import OVModelForSpeechSeq2Seq
+        from transformers import AutoProcessor
+        model_id = f"openai/whisper-{model_size}"
+        return _HFWhisper(
+            model=OVModelForSpeechSeq2Seq.from_pretrained(
+                model_id,
+                export=True,
+                load_in_8bit=True,
+                cache_dir=download_root
+            ),
+            processor=AutoProcessor.from_pretrained(model_id, cache_dir=download_root)
+        )
+    
+    if backend == "onnx":
+        # export مدل HuggingFace به ONNX؛ روی GPU ورودی/خروجی‌ها و KV-cache با
+        # IOBinding روی حافظه GPU می‌مانند و بین host و device کپی نمی‌شوند
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import AutoProcessor
+        model_id = f"openai/whisper-{model_size}"
+        on_gpu = device == "cuda"
+        return _HFWhisper(
+            model=ORTModelForSpeechSeq2Seq.from_pretrained(
+                model_id,
+                export=True,
+                provider="CUDAExecutionProvider" if on_gpu else "CPUExecutionProvider",
+                use_io_binding=on_gpu,
+                cache_dir=download_root
+            ),
+            processor=AutoProcessor.from_pretrained(model_id, cache_dir=download_root)
+        )
+    
+    if device == "cpu":
+        # تعداد thread ثابت برای ضرب ماتریس‌ها (جلوگیری از oversubscription روی CPUهای چند سوکتی)
+        # و فعال بودن kernelهای oneDNN (MKLDNN)
+        import torch
+        torch.set_num_threads(settings.WHISPER_THREADS or os.cpu_count() or 1)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            # فقط پیش از شروع اولین عملیات موازی قابل تنظیم است
+            pass
+        torch.backends.mkldnn.enabled = True
+    
+    model = whisper.load_model(model_size, device=device, download_root=download_root)
+    
+    if device == "cpu" and settings.WHISPER_QUANTIZE_DECODER:
+        model.decoder = _quantize_decoder(model.decoder)
+    
+    return model
+
+
+def _quantize_decoder(decoder):
+    """
+    کوانتیزه کردن dynamic (INT8) لایه‌های Linear دیکودر Whisper روی CPU
+    
+    دیکودر به ازای هر توکن اجرا می‌شود و بیشترین زمان را می‌گیرد؛ encoder و
+    لایه خروجی (token_embedding) برای حفظ دقت فارسی در FP32 باقی می‌مانند.
+    """
+    import torch
+    
+    engine = "qnnpack" if platform.machine().lower() in ("arm64", "aarch64") else "fbgemm"
+    if engine in torch.backends.quantized.supported_engines:
+        torch.backends.quantized.engine = engine
+    
+    # whisper.model.Linear فقط cast نوع داده را به nn.Linear اضافه می‌کند (لازم برای FP16)؛
+    # quantize_dynamic فقط نوع دقیق nn.Linear را جایگزین می‌کند
+    for module in decoder.modules():
+        if isinstance(module, whisper.model.Linear):
+            module.__class__ = torch.nn.Linear
+    
+    return torch.ao.quantization.quantize_dynamic(
+        decoder,
+        {torch.nn.Linear},
+        dtype=torch.qint8
+    )
+
+
+# مدل Silero VAD حالت داخلی (RNN) دارد؛ درخواست‌های همزمان باید پشت سر هم اجرا شوند
+_vad_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _load_vad():
+    """بارگذاری مدل Silero VAD (یک بار در هر process)"""
+    from silero_vad import load_silero_vad
+    return load_silero_vad()
+
+
+# ========================================
+# Batch کردن درخواست‌های همزمان
+# ========================================
+class _BatchScheduler:
+    """
+    جمع‌آوری درخواست‌های همزمان transcription کلیپ‌های کوتاه (حداکثر 30 ثانیه)
+    و اجرای آن‌ها به صورت یک batch روی مدل
+    
+    encoder و decoder به جای چند فراخوانی تک‌نمونه‌ای، یک بار با batch کامل
+    اجرا می‌شوند. هر batch حداکثر max_wait ثانیه برای پر شدن صبر می‌کند.
+    """
+    
+    def __init__(self, service: "VoiceService", max_batch: int, max_wait: float):
+        self._service = service
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    async def submit(self, audio: np.ndarray, language: str) -> Dict[str, Any]:
+        """
+        افزودن کلیپ به batch بعدی و انتظار برای نتیجه آن
+        
+        Args:
+            audio: سیگنال decode شده (حداکثر 30 ثانیه)
+            language: زبان
+            
+        Returns:
+            Dict: نتیجه هم‌شکل خروجی model.transcribe
+        """
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio, language, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """حلقه پس‌زمینه: ساخت batch و اجرای آن در thread pool مدل"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._max_wait
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # هر batch فقط شامل یک زبان است
+            by_language: Dict[str, list] = {}
+            for item in batch:
+                by_language.setdefault(item[1], []).append(item)
+            
+            for language, items in by_language.items():
+                futures = [future for _, _, future in items]
+                try:
+                    results = await loop.run_in_executor(
+                        self._service._transcribe_pool,
+                        partial(
+                            self._service._run_batched_decode,
+                            [audio for audio, _, _ in items],
+                            language
+                        )
+                    )
+                except Exception as e:
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                
+                for future, result in zip(futures, results):
+                    if not future.done():
+                        future.set_result(result)
 
 
 class VoiceService:
@@ -31,14 +284,27 @@ class VoiceService:
     """
     
     # فرمت‌های مجاز
-    ALLOWED_FORMATS = ["wav", "mp3", "m4a", "ogg", "webm", "flac"]
+    ALLOWED_FORMATS = frozenset({"wav", "mp3", "m4a", "ogg", "webm", "flac"})
+    
+    # پسوندهای مجاز برای هر فرمت تشخیص داده شده از magic bytes
+    SIGNATURE_EXTENSIONS = {
+        "wav": frozenset({"wav"}),
+        "flac": frozenset({"flac"}),
+        "ogg": frozenset({"ogg"}),
+        "webm": frozenset({"webm"}),
+        "m4a": frozenset({"m4a"}),
+        "mp3": frozenset({"mp3"}),
+    }
     
     # حداکثر سایز فایل (10MB)
     MAX_FILE_SIZE = 10 * 1024 * 1024
     
+    # موتورهایی که فراخوانی همزمان یک نمونه مدل از چند thread را پشتیبانی می‌کنند
+    THREAD_SAFE_BACKENDS = frozenset({"faster-whisper"})
+    
     def __init__(self):
         """
-        تنظیم و بارگذاری مدل Whisper
+        تنظیم سرویس (مدل Whisper در اولین استفاده یا warmup بارگذاری می‌شود)
         
         مدل‌های موجود:
         - tiny: سریع، دقت کم (~1GB RAM)
@@ -51,19 +317,125 @@ class VoiceService:
         self.upload_dir = Path(settings.UPLOAD_DIR)
         self.upload_dir.mkdir(parents=True, exist_ok=True)
         
-        # بارگذاری مدل Whisper
+        # سایز مدل Whisper
         # برای شروع از base استفاده می‌کنیم (تعادل خوب بین سرعت و دقت)
-        model_size = os.environ.get("WHISPER_MODEL_SIZE", "base")
+        self.model_size = os.environ.get("WHISPER_MODEL_SIZE", "base")
+        
+        # موتور اجرا: faster-whisper (CTranslate2 با INT8) یا openai-whisper
+        self.backend = settings.WHISPER_BACKEND
         
-        print(f"🔄 در حال بارگذاری مدل Whisper ({model_size})...")
+        # دستگاه اجرا: روی GPU محاسبات با FP16 انجام می‌شود
+        self.device = self._resolve_device(settings.WHISPER_DEVICE)
+        self.fp16 = self.device == "cuda"
+        # روی CPUهای دارای AMX/AVX-512 BF16 محاسبات با autocast به bfloat16 انجام می‌شود
+        # (با دیکودر INT8 قابل ترکیب نیست: لایه‌های کوانتیزه ورودی FP32 می‌خواهند)
+        self.cpu_bf16 = (
+            self.device == "cpu"
+            and settings.WHISPER_CPU_BF16
+            and not settings.WHISPER_QUANTIZE_DECODER
+        )
+        
+        # مدل به صورت lazy بارگذاری می‌شود تا import ماژول (و راه‌اندازی هر worker) سریع بماند
+        self.model = None
+        self._model_lock = asyncio.Lock()
+        
+        # thread pool اختصاصی مدل: دسترسی به یک نمونه مدل سریال می‌شود و
+        # thread pool پیش‌فرض (فایل، decode و ...) توسط Whisper اشغال نمی‌شود
+        self._transcribe_pool = self._create_transcribe_pool()
+        
+        # batch کردن کلیپ‌های کوتاه همزمان (فقط openai-whisper)
+        self._scheduler = _BatchScheduler(
+            self,
+            max_batch=settings.WHISPER_BATCH_SIZE,
+            max_wait=settings.WHISPER_BATCH_WAIT_MS / 1000
+        )
+        
+        # client Redis برای cache نتایج (lazy، فقط در حالت redis)
+        self._redis = None
+    
+    def _create_transcribe_pool(self) -> ThreadPoolExecutor:
+        """
+        ساخت thread pool مدل
+        
+        openai-whisper (hook های kv-cache روی ماژول‌های مشترک دیکودر)، OpenVINO و
+        ONNX Runtime (IOBinding) روی یک نمونه مشترک thread-safe نیستند و همیشه یک
+        worker دارند؛ فقط موتورهای THREAD_SAFE_BACKENDS از WHISPER_CONCURRENCY استفاده می‌کنند.
+        """
+        workers = settings.WHISPER_CONCURRENCY if self.backend in self.THREAD_SAFE_BACKENDS else 1
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="whisper")
+    
+    def shutdown(self) -> None:
+        """بستن thread pool مدل (در shutdown اپلیکیشن)"""
+        self._transcribe_pool.shutdown(wait=False, cancel_futures=True)
+    
+    async def warmup(self) -> None:
+        """
+        بارگذاری مدل پیش از اولین درخواست (از startup اپلیکیشن صدا زده می‌شود)
+        """
         try:
-            self.model = whisper.load_model(model_size)
+            await self._ensure_model_loaded()
+        except Exception as e:
+            print(f"❌ خطا در warmup مدل Whisper: {e}")
+    
+    async def _ensure_model_loaded(self) -> None:
+        """
+        بارگذاری مدل در اولین استفاده (فقط یک بار، حتی با درخواست‌های همزمان)
+        """
+        if self.model is not None:
+            return
+        
+        async with self._model_lock:
+            if self.model is None:
+                await to_thread.run_sync(self._load_model_with_fallback)
+    
+    def _load_model_with_fallback(self) -> None:
+        """
+        بارگذاری مدل (اجرا در worker thread)
+        
+        در صورت خطا به openai-whisper و در نهایت به مدل tiny برمی‌گردد.
+        """
+        model_size = self.model_size
+        print(f"🔄 در حال بارگذاری مدل Whisper ({model_size}, {self.backend}, {self.device})...")
+        try:
+            self.model = _load_whisper(self.backend, model_size, self.device)
             print(f"✅ مدل Whisper بارگذاری شد: {model_size}")
         except Exception as e:
             print(f"❌ خطا در بارگذاری مدل: {e}")
-            # اگر مدل لود نشد، به tiny برگرد (کوچک‌ترین)
-            print("⚠️ تلاش برای بارگذاری مدل tiny...")
-            self.model = whisper.load_model("tiny")
+            if self.backend != "openai-whisper":
+                # بازگشت به openai-whisper (مثلاً اگر faster-whisper نصب نباشد)
+                print("⚠️ تلاش برای بارگذاری با openai-whisper...")
+                self.backend = "openai-whisper"
+                # pool برای موتور جدید (تک worker) دوباره ساخته می‌شود؛ پیش از بارگذاری
+                # مدل هیچ transcriptionی در pool اجرا نشده است
+                self._transcribe_pool.shutdown(wait=False)
+                self._transcribe_pool = self._create_transcribe_pool()
+                self.model = _load_whisper(self.backend, model_size, self.device)
+            else:
+                # اگر مدل لود نشد، به tiny برگرد (کوچک‌ترین)
+                print("⚠️ تلاش برای بارگذاری مدل tiny...")
+                self.model = _load_whisper(self.backend, "tiny", self.device)
+    
+    @staticmethod
+    def _resolve_device(device: str) -> str:
+        """
+        تعیین دستگاه اجرا (cuda فقط در صورت در دسترس بودن GPU)
+        
+        Args:
+            device: مقدار WHISPER_DEVICE (cpu, cuda, auto)
+            
+        Returns:
+            str: cpu یا cuda
+        """
+        if device == "cpu":
+            return "cpu"
+        
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        
+        if device == "cuda":
+            print("⚠️ GPU در دسترس نیست؛ Whisper روی CPU اجرا می‌شود")
+        return "cpu"
     
     def validate_audio_file(self, file: UploadFile) -> None:
         """
@@ -79,13 +451,20 @@ class VoiceService:
         Raises:
             HTTPException: اگر فایل نامعتبر باشد
         """
+        # بررسی نام فایل
+        if not file.filename:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="نام فایل ارسال نشده است"
+            )
+        
         # بررسی فرمت
-        file_extension = file.filename.split(".")[-1].lower()
+        file_extension = self._get_extension(file.filename)
         
         if file_extension not in self.ALLOWED_FORMATS:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"فرمت فایل باید یکی از {', '.join(self.ALLOWED_FORMATS)} باشد"
+                detail=f"فرمت فایل باید یکی از {', '.join(sorted(self.ALLOWED_FORMATS))} باشد"
             )
         
         # بررسی سایز
@@ -97,53 +476,149 @@ class VoiceService:
                     detail=f"سایز فایل نباید بیشتر از {max_mb}MB باشد"
                 )
     
-    async def save_audio_file(
+    @staticmethod
+    def _detect_audio_format(header: bytes) -> Optional[str]:
+        """
+        تشخیص فرمت فایل صوتی از روی magic bytes ابتدای فایل
+        
+        Args:
+            header: حداقل 12 بایت اول فایل
+            
+        Returns:
+            str: فرمت تشخیص داده شده (None اگر فایل صوتی شناخته شده نباشد)
+        """
+        if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+            return "wav"
+        if header[:4] == b"fLaC":
+            return "flac"
+        if header[:4] == b"OggS":
+            return "ogg"
+        if header[:4] == b"\x1a\x45\xdf\xa3":  # EBML (WebM / Matroska)
+            return "webm"
+        if header[4:8] == b"ftyp":  # ISO-BMFF (m4a / mp4)
+            return "m4a"
+        if header[:3] == b"ID3":  # MP3 با تگ ID3
+            return "mp3"
+        if len(header) >= 2 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0:
+            return "mp3"  # frame sync MPEG audio (بدون تگ)
+        return None
+    
+    def check_audio_signature(self, header: bytes, file_extension: str) -> None:
+        """
+        اعتبارسنجی محتوای فایل (نه فقط پسوند) پیش از ذخیره و تبدیل
+        
+        Args:
+            header: بایت‌های ابتدای فایل
+            file_extension: پسوند اعلام شده فایل
+            
+        Raises:
+            HTTPException 400: اگر محتوا فایل صوتی شناخته شده نباشد یا با پسوند همخوانی نداشته باشد
+        """
+        detected_format = self._detect_audio_format(header[:16])
+        
+        if detected_format is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="محتوای فایل، فایل صوتی معتبر نیست"
+            )
+        
+        if file_extension not in self.SIGNATURE_EXTENSIONS[detected_format]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"محتوای فایل ({detected_format}) با پسوند آن ({file_extension}) همخوانی ندارد"
+            )
+    
+    @staticmethod
+    def _get_extension(filename: str) -> str:
+        """پسوند فایل (بدون نقطه، حروف کوچک)"""
+        return os.path.splitext(filename)[1][1:].lower()
+    
+    async def read_audio_file(self, file: UploadFile) -> bytes:
+        """
+        خواندن کامل فایل صوتی آپلود شده در حافظه (حداکثر MAX_FILE_SIZE)
+        
+        Args:
+            file: فایل صوتی
+            
+        Returns:
+            bytes: محتوای فایل
+            
+        Raises:
+            HTTPException 413: اگر فایل بزرگ‌تر از حد مجاز باشد
+        """
+        self._check_content_length(file)
+        
+        data = await file.read(self.MAX_FILE_SIZE + 1)
+        if len(data) > self.MAX_FILE_SIZE:
+            self._raise_file_too_large()
+        return data
+    
+    async def write_audio_file(
         self,
-        file: UploadFile,
-        report_id: str
+        data: bytes,
+        report_id: str,
+        file_extension: str
     ) -> Dict[str, Any]:
         """
-        ذخیره فایل صوتی در سرور
+        نوشتن محتوای فایل صوتی (که قبلاً خوانده شده) روی دیسک
         
         Args:
-            file: فایل صوتی
+            data: محتوای فایل
             report_id: شناسه گزارش
+            file_extension: پسوند فایل
             
         Returns:
             Dict حاوی اطلاعات فایل
         """
-        # ساخت نام یکتا
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_extension = file.filename.split(".")[-1].lower()
-        filename = f"{report_id}_{timestamp}.{file_extension}"
-        
-        # مسیر کامل
-        file_path = self.upload_dir / filename
-        
-        # ذخیره فایل
-        file_size = 0
-        async with aiofiles.open(file_path, 'wb') as f:
-            while chunk := await file.read(1024 * 1024):  # 1MB chunks
-                await f.write(chunk)
-                file_size += len(chunk)
+        file_path = self._build_file_path(report_id, file_extension)
+        await to_thread.run_sync(file_path.write_bytes, data)
         
         return {
             "file_path": str(file_path),
-            "file_size": file_size,
+            "file_size": len(data),
             "file_extension": file_extension
         }
     
+    def _build_file_path(self, report_id: str, file_extension: str) -> Path:
+        """
+        ساخت مسیر یکتا برای فایل صوتی گزارش
+        
+        زمان به نانوثانیه (hex) و یک پسوند تصادفی کوتاه، یکتا بودن نام را بین
+        درخواست‌های همزمان و workerهای مختلف تضمین می‌کنند.
+        """
+        timestamp = f"{time.time_ns():x}"
+        filename = f"{report_id}_{timestamp}{os.urandom(3).hex()}.{file_extension}"
+        return self.upload_dir / filename
+    
+    def _check_content_length(self, file: UploadFile) -> None:
+        """بررسی Content-Length (در صورت وجود) پیش از خواندن/نوشتن فایل"""
+        content_length = file.headers.get("content-length") if file.headers else None
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.MAX_FILE_SIZE:
+                self._raise_file_too_large()
+    
+    def _raise_file_too_large(self) -> None:
+        """ارسال خطای 413 برای فایل بزرگ‌تر از حد مجاز"""
+        max_mb = self.MAX_FILE_SIZE / (1024 * 1024)
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"سایز فایل نباید بیشتر از {max_mb}MB باشد"
+        )
+    
     async def transcribe_audio(
         self,
-        file_path: str,
-        language: str = "fa"
+        audio: Union[str, np.ndarray],
+        language: str = "fa",
+        on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         تبدیل فایل صوتی به متن با Whisper آفلاین
         
         Args:
-            file_path: مسیر فایل صوتی
+            audio: مسیر فایل صوتی یا سیگنال decode شده (float32، mono، 16kHz)
             language: زبان (fa برای فارسی، en برای انگلیسی)
+            on_segment: callback برای هر segment آماده ({start, end, text})؛
+                ممکن است از worker thread صدا زده شود
             
         Returns:
             Dict حاوی:
@@ -156,15 +631,43 @@ class VoiceService:
             HTTPException: در صورت خطا در تبدیل
         """
         try:
-            print(f"🔄 شروع transcription: {file_path}")
+            await self._ensure_model_loaded()
             
-            # Transcribe با Whisper
-            result = self.model.transcribe(
-                file_path,
-                language=language,  # فارسی
-                fp16=False,  # برای CPU
-                verbose=False
-            )
+            source = audio if isinstance(audio, str) else "in-memory audio"
+            print(f"🔄 شروع transcription: {source}")
+            
+            # decode و resample به 16kHz فقط یک بار (نه در هر تلاش مجدد)
+            if isinstance(audio, str):
+                audio = await to_thread.run_sync(self._load_audio_file, audio)
+            
+            # حذف سکوت‌ها با VAD (faster-whisper خودش vad_filter دارد)
+            speech_intervals = None
+            model_audio = audio
+            if settings.WHISPER_VAD and self.backend != "faster-whisper":
+                trimmed = await to_thread.run_sync(self._trim_silence, audio)
+                if trimmed is not None:
+                    model_audio, speech_intervals = trimmed
+            
+            # ارسال هر segment (با زمان صدای اصلی) به محض آماده شدن
+            emit = None
+            if on_segment is not None:
+                def emit(segment: Dict[str, Any]) -> None:
+                    segment = dict(segment)
+                    if speech_intervals is not None:
+                        self._remap_segments([segment], speech_intervals)
+                    on_segment({
+                        "start": round(segment["start"], 2),
+                        "end": round(segment["end"], 2),
+                        "text": segment["text"].strip(),
+                    })
+            
+            # Transcribe با Whisper (در worker thread تا event loop مسدود نشود)
+            result = await self._transcribe_with_retry(model_audio, language, emit)
+            
+            # بازگرداندن زمان segments به محور زمانی صدای اصلی
+            if speech_intervals is not None:
+                self._remap_segments(result.get("segments", []), speech_intervals)
+                result["duration"] = len(audio) / SAMPLE_RATE
             
             # استخراج اطلاعات
             text = result["text"].strip()
@@ -174,21 +677,30 @@ class VoiceService:
             # از میانگین log probabilities استفاده می‌کنیم
             segments = result.get("segments", [])
             if segments:
-                # محاسبه میانگین no_speech_prob (هرچه کمتر، بهتر)
-                avg_no_speech = sum(s.get("no_speech_prob", 0.5) for s in segments) / len(segments)
-                confidence = 1.0 - avg_no_speech  # تبدیل به confidence
+                # میانگین no_speech_prob (هرچه کمتر، بهتر) با reduction برداری numpy
+                no_speech_probs = np.fromiter(
+                    (s.get("no_speech_prob", 0.5) for s in segments),
+                    dtype=np.float32,
+                    count=len(segments)
+                )
+                confidence = float(1.0 - no_speech_probs.mean())  # تبدیل به confidence
             else:
                 confidence = 0.8  # مقدار پیش‌فرض
             
-            # محاسبه مدت زمان
-            duration = self._get_audio_duration_from_segments(segments)
+            # محاسبه مدت زمان (faster-whisper مدت کامل فایل را برمی‌گرداند؛
+            # در غیر این صورت پایان آخرین segment و در نبود آن طول سیگنال)
+            duration = (
+                result.get("duration")
+                or (segments[-1].get("end") if segments else None)
+                or len(audio) / SAMPLE_RATE
+            )
             
             print(f"✅ Transcription موفق: {len(text)} کاراکتر")
             
             return {
                 "text": text,
                 "confidence": round(confidence, 2),
-                "duration": duration,
+                "duration": round(duration, 2),
                 "language": detected_language,
                 "segments_count": len(segments)
             }
@@ -200,41 +712,417 @@ class VoiceService:
                 detail=f"خطا در تبدیل صدا به متن: {str(e)}"
             )
     
-    def _get_audio_duration_from_segments(self, segments: list) -> Optional[float]:
+    async def _transcribe_with_retry(
+        self,
+        audio: Union[str, np.ndarray],
+        language: str,
+        on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
         """
-        محاسبه مدت زمان از segments
+        اجرای transcription با همزمانی محدود و تلاش مجدد (exponential backoff + jitter)
+        
+        فقط خطاهای موقت (کمبود حافظه GPU) دوباره تلاش می‌شوند؛ خطاهای قطعی مثل
+        decode یا shape بلافاصله برگردانده می‌شوند. اگر segmentی
+        ارسال شده باشد تلاش مجدد انجام نمی‌شود تا segment تکراری ارسال نشود.
         
         Args:
-            segments: لیست segments از Whisper
+            audio: مسیر فایل صوتی یا سیگنال decode شده
+            language: زبان
+            on_segment: callback هر segment (faster-whisper هنگام decode، بقیه موتورها در پایان)
             
         Returns:
-            float: مدت زمان به ثانیه
+            Dict: خروجی خام model.transcribe
+        """
+        emitted = False
+        
+        def emit(segment: Dict[str, Any]) -> None:
+            nonlocal emitted
+            emitted = True
+            on_segment(segment)
+        
+        attempt = 0
+        while True:
+            try:
+                if self._can_batch(audio):
+                    result = await self._scheduler.submit(audio, language)
+                else:
+                    async with _transcription_semaphore:
+                        result = await asyncio.get_running_loop().run_in_executor(
+                            self._transcribe_pool,
+                            partial(
+                                self._run_transcription,
+                                audio,
+                                language,
+                                emit if on_segment is not None else None
+                            )
+                        )
+                
+                # موتورهایی که segment ها را تدریجی تولید نمی‌کنند
+                if on_segment is not None and not emitted:
+                    for segment in result.get("segments", []):
+                        emit(segment)
+                return result
+            except Exception as e:
+                if (
+                    not self._is_transient_error(e)
+                    or attempt >= settings.WHISPER_MAX_RETRIES
+                    or emitted
+                ):
+                    raise
+                delay = min(2 ** attempt, 30) + random.uniform(0, 1)
+                attempt += 1
+                print(f"⚠️ خطای موقت در transcription ({e})، تلاش مجدد {attempt} پس از {delay:.1f} ثانیه")
+                await asyncio.sleep(delay)
+    
+    @staticmethod
+    def _is_transient_error(error: Exception) -> bool:
+        """
+        آیا خطا موقت است و تلاش مجدد ممکن است موفق شود؟ (فقط کمبود حافظه GPU)
+        
+        torch نوع مشخص OutOfMemoryError دارد؛ CTranslate2 و ONNX Runtime کمبود حافظه
+        CUDA را با پیام "out of memory" گزارش می‌کنند.
+        """
+        try:
+            import torch
+            if isinstance(error, torch.cuda.OutOfMemoryError):
+                return True
+        except (ImportError, AttributeError):
+            pass
+        return "out of memory" in str(error).lower()
+    
+    def _can_batch(self, audio: Union[str, np.ndarray]) -> bool:
+        """
+        آیا این درخواست می‌تواند در batch اجرا شود؟
+        (openai-whisper، سیگنال decode شده و حداکثر یک پنجره 30 ثانیه‌ای)
         """
-        if not segments:
+        return (
+            settings.WHISPER_BATCH_SIZE > 1
+            and self.backend == "openai-whisper"
+            and isinstance(self.model, whisper.Whisper)
+            and isinstance(audio, np.ndarray)
+            and len(audio) <= whisper.audio.N_SAMPLES
+        )
+    
+    def _run_batched_decode(
+        self,
+        audios: list,
+        language: str
+    ) -> list:
+        """
+        decode یک batch از کلیپ‌های کوتاه با یک فراخوانی مدل (اجرا در thread pool مدل)
+        
+        فقط یک decode greedy است (بدون fallback دمایی، بررسی compression ratio و
+        حذف بخش بی‌صدای model.transcribe)؛ به همین دلیل batch به صورت پیش‌فرض غیرفعال است.
+        
+        Args:
+            audios: لیست سیگنال‌ها (هر کدام حداکثر 30 ثانیه)
+            language: زبان
+            
+        Returns:
+            list: نتیجه هر کلیپ، هم‌شکل خروجی model.transcribe
+        """
+        import torch
+        
+        # سیگنال پیش از محاسبه mel به دستگاه مدل منتقل می‌شود (STFT روی GPU با cuFFT)
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(audio).to(self.model.device)),
+                self.model.dims.n_mels
+            )
+            for audio in audios
+        ])
+        
+        options = whisper.DecodingOptions(
+            language=language,
+            fp16=self.fp16,
+            without_timestamps=True
+        )
+        with self._autocast():
+            decoded = whisper.decode(self.model, mel, options)
+        
+        results = []
+        for audio, result in zip(audios, decoded):
+            duration = len(audio) / SAMPLE_RATE
+            results.append({
+                "text": result.text,
+                "language": result.language,
+                "segments": [{
+                    "start": 0.0,
+                    "end": duration,
+                    "text": result.text,
+                    "no_speech_prob": result.no_speech_prob,
+                    "avg_logprob": result.avg_logprob,
+                }],
+                "duration": duration,
+            })
+        return results
+    
+    def _run_transcription(
+        self,
+        audio: Union[str, np.ndarray],
+        language: str,
+        on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        فراخوانی blocking مدل Whisper (اجرا در worker thread)
+        
+        Args:
+            audio: مسیر فایل صوتی یا سیگنال decode شده
+            language: زبان
+            on_segment: callback هر segment هنگام decode (فقط faster-whisper)
+            
+        Returns:
+            Dict: خروجی model.transcribe (در faster-whisper به همان شکل تبدیل می‌شود)
+        """
+        if self.backend == "faster-whisper":
+            return self._run_faster_whisper(audio, language, on_segment)
+        
+        if isinstance(self.model, _HFWhisper):
+            return self._run_hf_whisper(audio, language)
+        
+        # روی GPU سیگنال به صورت tensor داده می‌شود تا mel spectrogram هم روی GPU محاسبه شود
+        if self.device == "cuda" and isinstance(audio, np.ndarray):
+            import torch
+            audio = torch.from_numpy(audio).to(self.model.device)
+        
+        with self._autocast():
+            return self.model.transcribe(
+                audio,
+                language=language,  # فارسی
+                fp16=self.fp16,  # FP16 فقط روی GPU
+                verbose=False
+            )
+    
+    def _autocast(self):
+        """
+        context اجرای مدل openai-whisper: autocast به bfloat16 روی CPU (WHISPER_CPU_BF16)
+        
+        fp16 در این حالت False می‌ماند تا Whisper ورودی را FP32 نگه دارد.
+        """
+        if not self.cpu_bf16:
+            return nullcontext()
+        
+        import torch
+        return torch.autocast("cpu", dtype=torch.bfloat16)
+    
+    def _run_faster_whisper(
+        self,
+        audio: Union[str, np.ndarray],
+        language: str,
+        on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        اجرای faster-whisper و تبدیل خروجی به شکل خروجی openai-whisper
+        
+        segments یک generator است و decode واقعی هنگام پیمایش آن انجام می‌شود؛
+        هر segment به محض decode به on_segment داده می‌شود.
+        """
+        segments, info = self.model.transcribe(
+            audio,
+            language=language,
+            vad_filter=True,
+            beam_size=1
+        )
+        
+        segment_list = []
+        for segment in segments:
+            segment_list.append({
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "no_speech_prob": segment.no_speech_prob,
+                "avg_logprob": segment.avg_logprob,
+            })
+            if on_segment is not None:
+                on_segment(segment_list[-1])
+        
+        return {
+            "text": "".join(segment["text"] for segment in segment_list),
+            "language": info.language,
+            "segments": segment_list,
+            "duration": info.duration,
+        }
+    
+    def _run_hf_whisper(
+        self,
+        audio: Union[str, np.ndarray],
+        language: str
+    ) -> Dict[str, Any]:
+        """
+        اجرای مدل با رابط HuggingFace (OpenVINO / ONNX Runtime) و تبدیل خروجی به شکل خروجی openai-whisper
+        
+        صدا به پنجره‌های 30 ثانیه‌ای (طول ورودی encoder) تقسیم و به صورت یک batch
+        به generate داده می‌شود؛ هر پنجره یک segment است.
+        """
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio)
+        
+        model, processor = self.model
+        window = 30 * SAMPLE_RATE
+        chunks = [audio[i:i + window] for i in range(0, max(len(audio), 1), window)]
+        
+        features = processor(
+            chunks,
+            sampling_rate=SAMPLE_RATE,
+            return_tensors="pt"
+        ).input_features
+        
+        # ورودی روی همان دستگاه مدل (در ONNX Runtime با IOBinding: حافظه GPU)
+        model_device = getattr(model, "device", None)
+        if model_device is not None:
+            features = features.to(model_device)
+        output = model.generate(
+            features,
+            language=language,
+            task="transcribe",
+            return_dict_in_generate=True,
+            output_scores=True
+        )
+        texts = processor.batch_decode(output.sequences, skip_special_tokens=True)
+        
+        # میانگین log probability توکن‌های تولید شده برای هر پنجره
+        scores = model.compute_transition_scores(
+            output.sequences, output.scores, normalize_logits=True
+        )
+        avg_logprobs = [float(row[row.isfinite()].mean()) if row.isfinite().any() else 0.0 for row in scores]
+        
+        segment_list = []
+        for index, (text, avg_logprob) in enumerate(zip(texts, avg_logprobs)):
+            start = index * 30.0
+            segment_list.append({
+                "start": start,
+                "end": start + len(chunks[index]) / SAMPLE_RATE,
+                "text": text,
+                # این موتورها no_speech_prob ندارند؛ تقریب از احتمال توکن‌ها
+                "no_speech_prob": 1.0 - float(np.exp(avg_logprob)),
+                "avg_logprob": avg_logprob,
+            })
+        
+        return {
+            "text": " ".join(text.strip() for text in texts),
+            "language": language,
+            "segments": segment_list,
+            "duration": len(audio) / SAMPLE_RATE,
+        }
+    
+    @staticmethod
+    def _trim_silence(audio: np.ndarray) -> Optional[tuple]:
+        """
+        حذف بخش‌های بدون گفتار با Silero VAD (اجرا در worker thread)
+        
+        Args:
+            audio: سیگنال float32، mono، 16kHz
+            
+        Returns:
+            tuple: (سیگنال فقط شامل گفتار، لیست بازه‌های گفتار (start, end) به نمونه)
+            یا None اگر VAD در دسترس نباشد، گفتاری پیدا نشود یا حذفی لازم نباشد
+        """
+        try:
+            import torch
+            from silero_vad import get_speech_timestamps
+            with _vad_lock:
+                timestamps = get_speech_timestamps(
+                    torch.from_numpy(audio),
+                    _load_vad(),
+                    sampling_rate=SAMPLE_RATE
+                )
+        except Exception:
             return None
         
-        # آخرین segment
-        last_segment = segments[-1]
-        duration = last_segment.get("end", 0)
+        if not timestamps:
+            return None
+        
+        intervals = [(ts["start"], ts["end"]) for ts in timestamps]
+        if sum(end - start for start, end in intervals) >= len(audio):
+            return None
         
-        return round(duration, 2) if duration else None
+        speech = np.concatenate([audio[start:end] for start, end in intervals])
+        return speech, intervals
     
-    def _get_audio_duration(self, file_path: str) -> Optional[float]:
+    @staticmethod
+    def _remap_segments(segments: list, intervals: list) -> None:
         """
-        محاسبه مدت زمان فایل صوتی با pydub
+        تبدیل زمان segments از صدای کوتاه شده (پس از VAD) به زمان صدای اصلی
+        
+        Args:
+            segments: segments خروجی مدل (درجا تغییر می‌کنند)
+            intervals: بازه‌های گفتار (start, end) به نمونه در صدای اصلی
+        """
+        # شروع هر بازه در محور زمانی صدای کوتاه شده
+        offsets = []
+        total = 0
+        for start, end in intervals:
+            offsets.append(total)
+            total += end - start
+        
+        def to_original(seconds: float) -> float:
+            sample = seconds * SAMPLE_RATE
+            index = max(bisect.bisect_right(offsets, sample) - 1, 0)
+            start, end = intervals[index]
+            return min(start + (sample - offsets[index]), end) / SAMPLE_RATE
+        
+        for segment in segments:
+            segment["start"] = to_original(segment["start"])
+            segment["end"] = to_original(segment["end"])
+    
+    @staticmethod
+    def _load_audio_file(file_path: str) -> np.ndarray:
+        """
+        decode فایل صوتی و resample به 16kHz mono (قالب ورودی Whisper)
+        
+        در صورت نصب بودن torchaudio، decode و resample در همان process انجام
+        می‌شود؛ در غیر این صورت ffmpeg مستقیماً فایل (قابل seek) را decode می‌کند.
+        (مسیر فایل فقط وقتی به اینجا می‌رسد که decode همان محتوا از pipe ناموفق بوده است)
         
         Args:
             file_path: مسیر فایل
             
         Returns:
-            float: مدت زمان به ثانیه
+            np.ndarray: سیگنال float32، mono، 16kHz
         """
         try:
-            from pydub import AudioSegment
-            audio = AudioSegment.from_file(file_path)
-            return len(audio) / 1000.0
+            import torchaudio
+            waveform, sample_rate = torchaudio.load(file_path)
+            if sample_rate != SAMPLE_RATE:
+                waveform = torchaudio.functional.resample(
+                    waveform,
+                    sample_rate,
+                    SAMPLE_RATE,
+                    lowpass_filter_width=6
+                )
+            return waveform.mean(0).numpy().astype(np.float32)
         except Exception:
+            return whisper.load_audio(file_path)
+    
+    @staticmethod
+    def _decode_audio_bytes(data: bytes) -> Optional[np.ndarray]:
+        """
+        decode محتوای فایل صوتی از حافظه با ffmpeg (از طریق pipe، بدون خواندن از دیسک)
+        
+        خروجی همان قالب whisper.load_audio است: float32، mono، 16kHz.
+        
+        Args:
+            data: محتوای فایل
+            
+        Returns:
+            np.ndarray: سیگنال صوتی (None اگر container از pipe قابل decode نباشد،
+            مثل m4a که moov atom آن در انتهای فایل است)
+        """
+        cmd = [
+            "ffmpeg", "-nostdin", "-threads", "0",
+            "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+            "-ar", str(SAMPLE_RATE),
+            "-"
+        ]
+        try:
+            out = subprocess.run(cmd, input=data, capture_output=True, check=True).stdout
+        except (subprocess.CalledProcessError, OSError):
             return None
+        
+        if not out:
+            return None
+        return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
     
     async def delete_audio_file(self, file_path: str) -> bool:
         """
@@ -246,47 +1134,107 @@ class VoiceService:
         Returns:
             bool: True اگر موفق باشد
         """
+        # فایل در object storage
+        if storage_service.is_object_uri(file_path):
+            return await storage_service.delete_object(file_path)
+        
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                return True
+            # حذف در thread pool تا event loop روی syscall فایل‌سیستم مسدود نشود
+            await aiofiles.os.remove(file_path)
+            return True
+        except FileNotFoundError:
             return False
-        except Exception:
+        except OSError:
+            # خطای دسترسی/دیسک پنهان نمی‌ماند؛ در مسیرهای پاکسازی خطای اصلی را نمی‌پوشاند
+            logger.exception("حذف فایل صوتی ناموفق بود: %s", file_path)
             return False
     
     async def process_voice_report(
         self,
         file: UploadFile,
-        report_id: str
+        report_id: str,
+        persist: bool = True,
+        on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         """
         پردازش کامل گزارش صوتی
         
         مراحل:
         1. اعتبارسنجی فایل
-        2. ذخیره فایل
-        3. تبدیل به متن
+        2. خواندن فایل در حافظه (حداکثر 10MB)
+        3. ذخیره فایل روی دیسک و تبدیل به متن به صورت همزمان
         4. بازگشت نتایج
         
+        Whisper مستقیماً از محتوای حافظه استفاده می‌کند و فایل ذخیره شده
+        دوباره از دیسک خوانده نمی‌شود؛ فقط اگر decode از حافظه ممکن نباشد
+        از فایل ذخیره شده استفاده می‌شود.
+        
         Args:
             file: فایل صوتی
             report_id: شناسه گزارش
+            persist: اگر False باشد فایل روی دیسک ذخیره نمی‌شود و فقط متن برمی‌گردد
+            on_segment: callback هر segment متن (برای پاسخ تدریجی)
             
         Returns:
-            Dict حاوی تمام اطلاعات پردازش
+            Dict حاوی تمام اطلاعات پردازش (file_path در حالت persist=False برابر None است)
         """
         # اعتبارسنجی
         self.validate_audio_file(file)
+        file_extension = self._get_extension(file.filename)
         
-        # ذخیره فایل
-        file_info = await self.save_audio_file(file, report_id)
+        # خواندن فایل و بررسی magic bytes
+        data = await self.read_audio_file(file)
+        self.check_audio_signature(data, file_extension)
         
-        # تبدیل به متن
-        transcription = await self.transcribe_audio(
-            file_info["file_path"],
-            language="fa"  # فارسی
+        # بدون نگهداری فایل: فقط تبدیل به متن از حافظه (با cache)
+        if not persist:
+            transcription = await self.transcribe_audio_bytes(
+                data,
+                file_extension,
+                language="fa",  # فارسی
+                on_segment=on_segment
+            )
+            return {
+                "file_path": None,
+                "file_size": len(data),
+                "file_extension": file_extension,
+                "transcribed_text": transcription["text"],
+                "confidence": transcription["confidence"],
+                "duration": transcription["duration"],
+                "language": transcription["language"]
+            }
+        
+        # نتیجه قبلی همین محتوا (در صورت وجود) بدون اجرای مدل استفاده می‌شود
+        cache_key = await self._transcription_cache_key(data, "fa")
+        transcription = await self._get_cached_transcription(cache_key)
+        
+        # ذخیره فایل (همزمان با decode و تبدیل به متن)
+        write_task = asyncio.ensure_future(
+            self.write_audio_file(data, report_id, file_extension)
         )
         
+        try:
+            if transcription is None:
+                audio = await to_thread.run_sync(self._decode_audio_bytes, data)
+                if audio is None:
+                    audio = (await write_task)["file_path"]
+                
+                # تبدیل به متن
+                transcription = await self.transcribe_audio(
+                    audio,
+                    language="fa",  # فارسی
+                    on_segment=on_segment
+                )
+                await self._set_cached_transcription(cache_key, transcription)
+            file_info = await write_task
+        except BaseException:
+            # فایل ذخیره شده بدون گزارش باقی نماند
+            if not write_task.done():
+                await asyncio.wait([write_task])
+            if not write_task.cancelled() and write_task.exception() is None:
+                await self.delete_audio_file(write_task.result()["file_path"])
+            raise
+        
         # ترکیب نتایج
         return {
             "file_path": file_info["file_path"],
@@ -297,6 +1245,197 @@ class VoiceService:
             "duration": transcription["duration"],
             "language": transcription["language"]
         }
+    
+    async def stream_voice_report(
+        self,
+        file: UploadFile,
+        report_id: str,
+        persist: bool = True
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        پردازش گزارش صوتی با ارسال تدریجی متن
+        
+        محاسبات همان process_voice_report است؛ فقط هر segment به محض آماده
+        شدن ارسال می‌شود تا client متن را پیش از پایان کل transcription نمایش دهد.
+        
+        Args:
+            file: فایل صوتی
+            report_id: شناسه گزارش
+            persist: نگهداری فایل روی دیسک
+            
+        Yields:
+            Tuple[str, Dict]: ("segment", {start, end, text}) و در پایان ("result", خروجی process_voice_report)
+        """
+        loop = asyncio.get_running_loop()
+        segments: asyncio.Queue = asyncio.Queue()
+        
+        task = asyncio.ensure_future(self.process_voice_report(
+            file,
+            report_id,
+            persist=persist,
+            on_segment=lambda segment: loop.call_soon_threadsafe(segments.put_nowait, segment)
+        ))
+        
+        next_segment = None
+        try:
+            while not task.done():
+                next_segment = asyncio.ensure_future(segments.get())
+                await asyncio.wait(
+                    {next_segment, task},
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_segment.done():
+                    yield "segment", next_segment.result()
+                else:
+                    next_segment.cancel()
+            
+            # segment هایی که همزمان با پایان پردازش رسیده‌اند
+            while not segments.empty():
+                yield "segment", segments.get_nowait()
+            
+            yield "result", task.result()
+        finally:
+            # قطع اتصال client: پردازش (و فایل ذخیره شده) لغو می‌شود
+            if next_segment is not None and not next_segment.done():
+                next_segment.cancel()
+            if not task.done():
+                task.cancel()
+            # منتظر پاکسازی process_voice_report پیش از خروج generator
+            await asyncio.gather(task, return_exceptions=True)
+    
+    async def transcribe_audio_bytes(
+        self,
+        data: bytes,
+        file_extension: str,
+        language: str = "fa",
+        on_segment: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        تبدیل به متن محتوای فایل صوتی که روی دیسک سرور نگهداری نمی‌شود
+        (مثلاً فایل خوانده شده از object storage)
+        
+        اگر decode از حافظه ممکن نباشد، محتوا موقتاً روی دیسک نوشته می‌شود.
+        
+        Args:
+            data: محتوای فایل
+            file_extension: پسوند فایل
+            language: زبان
+            on_segment: callback هر segment متن
+            
+        Returns:
+            Dict: خروجی transcribe_audio
+        """
+        cache_key = await self._transcription_cache_key(data, language)
+        transcription = await self._get_cached_transcription(cache_key)
+        if transcription is not None:
+            return transcription
+        
+        audio = await to_thread.run_sync(self._decode_audio_bytes, data)
+        if audio is not None:
+            transcription = await self.transcribe_audio(
+                audio, language=language, on_segment=on_segment
+            )
+        else:
+            def _write_temp_file() -> str:
+                with tempfile.NamedTemporaryFile(
+                    suffix=f".{file_extension}", delete=False
+                ) as f:
+                    f.write(data)
+                    return f.name
+            
+            temp_path = await to_thread.run_sync(_write_temp_file)
+            try:
+                transcription = await self.transcribe_audio(
+                    temp_path, language=language, on_segment=on_segment
+                )
+            finally:
+                await self.delete_audio_file(temp_path)
+        
+        await self._set_cached_transcription(cache_key, transcription)
+        return transcription
+    
+    # ========================================
+    # Cache نتایج Transcription
+    # ========================================
+    
+    async def _transcription_cache_key(
+        self,
+        data: bytes,
+        language: str
+    ) -> Optional[str]:
+        """
+        کلید cache نتیجه transcription یک فایل
+        
+        موتور، سایز مدل و زبان در کلید هستند تا تغییر مدل نتایج قبلی را باطل کند.
+        
+        Returns:
+            str: کلید cache یا None اگر cache غیرفعال باشد
+        """
+        if settings.TRANSCRIPTION_CACHE_TTL <= 0:
+            return None
+        
+        digest = await to_thread.run_sync(
+            lambda: hashlib.blake2b(data, digest_size=20).hexdigest()
+        )
+        return f"whisper:{self.backend}:{self.model_size}:{language}:{digest}"
+    
+    def _redis_client(self):
+        """ساخت client غیرهمزمان Redis (یک بار)"""
+        if self._redis is None:
+            from redis import asyncio as aioredis
+            self._redis = aioredis.Redis(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD,
+                decode_responses=True
+            )
+        return self._redis
+    
+    async def _get_cached_transcription(
+        self,
+        cache_key: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        خواندن نتیجه cache شده (خطای Redis مانع پردازش نمی‌شود)
+        """
+        if cache_key is None:
+            return None
+        
+        if settings.TRANSCRIPTION_CACHE_BACKEND != "redis":
+            cached = _transcription_cache.get(cache_key)
+            return dict(cached) if cached is not None else None
+        
+        try:
+            cached = await self._redis_client().get(cache_key)
+        except Exception as e:
+            print(f"⚠️ خطا در خواندن cache transcription: {e}")
+            return None
+        return json.loads(cached) if cached else None
+    
+    async def _set_cached_transcription(
+        self,
+        cache_key: Optional[str],
+        transcription: Dict[str, Any]
+    ) -> None:
+        """
+        ذخیره نتیجه transcription در cache
+        """
+        if cache_key is None:
+            return
+        
+        if settings.TRANSCRIPTION_CACHE_BACKEND != "redis":
+            _transcription_cache[cache_key] = dict(transcription)
+            return
+        
+        try:
+            await self._redis_client().setex(
+                cache_key,
+                settings.TRANSCRIPTION_CACHE_TTL,
+                json.dumps(transcription, ensure_ascii=False)
+            )
+        except Exception as e:
+            print(f"⚠️ خطا در ذخیره cache transcription: {e}")
 
 
 # ========================================
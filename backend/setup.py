@@ -0,0 +1,37 @@
+# =====================================
+# backend/setup.py
+# کامپایل اختیاری ماژول‌های پرتکرار با Cython (pure-Python mode)
+# =====================================
+# سورس .py بدون تغییر باقی می‌ماند؛ فایل .so کنار آن ساخته می‌شود و
+# پایتون هنگام import، extension module را به .py ترجیح می‌دهد.
+#
+# استفاده (داخل دایرکتوری backend):
+#   pip install cython
+#   python setup.py build_ext --inplace
+#
+# بررسی:
+#   python -c "import app.services.auth_service as m; print(m.__file__)"
+#   → باید به فایل .so اشاره کند
+# =====================================
+
+from setuptools import setup
+from Cython.Build import cythonize
+
+# ماژول‌هایی که در هر request احراز هویت صدا زده می‌شوند
+CYTHON_MODULES = [
+    "app/schemas/user.py",
+    "app/services/auth_service.py",
+]
+
+setup(
+    name="ai-hospital-backend",
+    ext_modules=cythonize(
+        CYTHON_MODULES,
+        language_level=3,
+        compiler_directives={
+            "boundscheck": False,
+            "wraparound": False,
+        },
+    ),
+    zip_safe=False,
+)